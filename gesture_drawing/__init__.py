@@ -1,3 +1,13 @@
 __all__ = ["GestureDrawingApp", "normalise"]
-from .gesture_app   import GestureDrawingApp
-from .llm_router    import normalise
+
+
+# imported on first access, so ``python -m gesture_drawing.server`` / ``.bench``
+# and the voice child process don't pull in OpenCV, MediaPipe or requests
+def __getattr__(name: str):
+    if name == "GestureDrawingApp":
+        from .gesture_app import GestureDrawingApp
+        return GestureDrawingApp
+    if name == "normalise":
+        from .llm_router import normalise
+        return normalise
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
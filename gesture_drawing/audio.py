@@ -0,0 +1,234 @@
+# audio.py
+
+"""One shared microphone for every voice consumer.
+
+The service opens the microphone and calibrates for ambient noise once,
+then hands each recognised utterance to whichever consumer is on top of
+the stack – the main command listener normally, a popup while one is open.
+
+Audio is read in 30 ms frames and segmented by a small energy-based voice
+activity detector, so an utterance ends after ``end_silence_ms`` of quiet
+instead of ``sr.Recognizer.listen``'s 0.8 s pause.  Frames are streamed to
+the recogniser as they arrive; engines with partial results (Vosk) let a
+consumer act on a short command before the phrase is even over.
+"""
+from __future__ import annotations
+
+import math
+import threading
+import time
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from . import latency
+from .recognisers import FixtureRecogniser, GoogleRecogniser, Recogniser
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+
+
+@dataclass(slots=True)
+class Consumer:
+    name: str
+    on_text: Callable[[str], None]
+    on_error: Optional[Callable[[str], None]] = None   # "could not understand" etc.
+    # partial transcript while the user is still speaking; return True if it
+    # was acted upon, and the final transcript of that utterance is dropped
+    on_partial: Optional[Callable[[str], bool]] = None
+
+
+def rms(frame: bytes) -> float:
+    samples = array("h", frame)
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+class VoiceActivityDetector:
+    """Energy VAD: speech after ``start_frames`` loud frames, end after silence."""
+
+    def __init__(
+        self,
+        threshold: float = 150.0,
+        start_frames: int = 2,
+        end_silence_ms: int = 250,
+        max_phrase_s: float = 4.0,
+        preroll_ms: int = 150,
+    ) -> None:
+        self.threshold = threshold
+        self.start_frames = start_frames
+        self.end_frames = max(1, end_silence_ms // FRAME_MS)
+        self.max_frames = int(max_phrase_s * 1000 // FRAME_MS)
+        self._preroll: deque[bytes] = deque(maxlen=max(1, preroll_ms // FRAME_MS))
+        self._segment: list[bytes] = []
+        self._loud = 0
+        self._quiet = 0
+        self.in_speech = False
+
+    def calibrate(self, frames: list[bytes], factor: float = 1.5) -> None:
+        """Set the threshold from ambient noise (never below the default)."""
+        if frames:
+            noise = sum(rms(f) for f in frames) / len(frames)
+            self.threshold = max(self.threshold, noise * factor)
+
+    def push(self, frame: bytes) -> tuple[list[bytes], bool]:
+        """Feed one frame → (frames to pass to the recogniser, utterance ended)."""
+        loud = rms(frame) >= self.threshold
+        if not self.in_speech:
+            self._preroll.append(frame)
+            self._loud = self._loud + 1 if loud else 0
+            if self._loud < self.start_frames:
+                return [], False
+            self.in_speech = True
+            self._quiet = 0
+            self._segment = list(self._preroll)
+            self._preroll.clear()
+            return list(self._segment), False
+
+        self._segment.append(frame)
+        self._quiet = 0 if loud else self._quiet + 1
+        if self._quiet >= self.end_frames or len(self._segment) >= self.max_frames:
+            self.in_speech = False
+            self._loud = 0
+            return [frame], True
+        return [frame], False
+
+    def take_segment(self) -> bytes:
+        data, self._segment = b"".join(self._segment), []
+        return data
+
+
+class AudioService:
+    def __init__(self) -> None:
+        self._stack: list[Consumer] = []
+        self._lock = threading.Lock()
+        self._has_consumer = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.engine: Recogniser | None = None   # set before start(); default Google
+        self.vad = VoiceActivityDetector()
+        self._phrase_trace: latency.Trace | None = None   # of the phrase partials came from
+
+    def configure(self, engine: Recogniser | None = None, **vad_options) -> None:
+        """Pick the recogniser / tune the VAD (call before the first consumer)."""
+        if engine is not None:
+            self.engine = engine
+        if vad_options:
+            self.vad = VoiceActivityDetector(**vad_options)
+
+    # -- consumers --------------------------------------------------------
+    def push(self, consumer: Consumer) -> None:
+        """Make *consumer* the receiver of utterances until it is removed."""
+        with self._lock:
+            self._stack.append(consumer)
+            self._has_consumer.set()
+        self.start()
+
+    def remove(self, consumer: Consumer) -> None:
+        with self._lock:
+            if consumer in self._stack:
+                self._stack.remove(consumer)
+            if not self._stack:
+                self._has_consumer.clear()
+
+    def active(self) -> Consumer | None:
+        with self._lock:
+            return self._stack[-1] if self._stack else None
+
+    # -- capture loop -----------------------------------------------------
+    def start(self) -> None:
+        if self._thread is None:
+            if self.engine is None:
+                self.engine = GoogleRecogniser()
+            self._thread = threading.Thread(target=self._run, name="audio", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        if isinstance(self.engine, FixtureRecogniser):
+            self._run_fixture(self.engine)
+            return
+        import speech_recognition as sr   # here, not at import: keeps startup light
+
+        engine, vad = self.engine, self.vad
+        with sr.Microphone(sample_rate=SAMPLE_RATE, chunk_size=FRAME_SAMPLES) as src:
+            read = lambda: src.stream.read(FRAME_SAMPLES, exception_on_overflow=False)
+            # once, not per popup
+            vad.calibrate([read() for _ in range(1000 // FRAME_MS)])
+            print(f"Listening for commands… ({engine.name}, threshold {vad.threshold:.0f})")
+            acted = False
+            while True:
+                if not vad.in_speech:
+                    self._has_consumer.wait()   # nobody listening → block, no polling
+                was_speaking = vad.in_speech
+                frames, ended = vad.push(read())
+                if frames and not was_speaking:  # new utterance (pre-roll + frame)
+                    engine.reset()
+                    acted = False
+                    self._phrase_trace = None
+                for frame in frames:
+                    partial = engine.feed(frame)
+                    if partial and not acted:
+                        acted = self._partial(partial)
+                if not ended:
+                    continue
+                audio = sr.AudioData(vad.take_segment(), SAMPLE_RATE, src.SAMPLE_WIDTH)
+                if acted:
+                    continue                    # already handled from a partial
+                # the user stopped talking end_silence_ms ago; count the VAD hangover too
+                trace = latency.begin(time.perf_counter() - vad.end_frames * FRAME_MS / 1000)
+                try:
+                    transcript = engine.finish(audio)
+                    trace.mark("recognised")
+                except sr.RequestError as exc:
+                    print(f"Speech-API request error: {exc}")
+                    self._error(f"Speech service error: {exc}")
+                    continue
+                if not transcript:
+                    self._error("Could not understand.")
+                    continue
+                self._deliver(transcript)
+
+    def _run_fixture(self, engine: FixtureRecogniser) -> None:
+        print(f"Replaying {len(engine.lines)} utterances from fixture")
+        for transcript in engine.utterances():
+            self._has_consumer.wait()
+            latency.begin().mark("recognised")   # no audio: only downstream stages
+            self._deliver(transcript)
+
+    def _partial(self, partial: str) -> bool:
+        consumer = self.active()
+        if consumer is None or consumer.on_partial is None:
+            return False
+        # speech hasn't ended yet – measure from the phrase's first partial,
+        # one trace however many partials follow
+        trace = self._phrase_trace
+        if trace is None:
+            trace = self._phrase_trace = latency.begin()
+            trace.source = "partial"
+        trace.mark("recognised")
+        try:
+            return bool(consumer.on_partial(partial))
+        except Exception as e:
+            print(f"[{consumer.name}] partial handler failed: {e!r}")
+            return False
+
+    def _deliver(self, transcript: str) -> None:
+        # route on delivery: a popup opened mid-phrase gets the phrase
+        consumer = self.active()
+        if consumer is None:
+            return
+        print(f"[{consumer.name}] Heard: {transcript!r}")
+        try:
+            consumer.on_text(transcript)
+        except Exception as e:
+            print(f"[{consumer.name}] consumer failed: {e!r}")
+
+    def _error(self, message: str) -> None:
+        consumer = self.active()
+        if consumer is not None and consumer.on_error is not None:
+            consumer.on_error(message)
+
+
+service = AudioService()
@@ -0,0 +1,304 @@
+# bench.py
+
+"""Headless benchmarks: ``python -m gesture_drawing.bench``.
+
+Needs no webcam, microphone or display – drawing goes to
+``headless.HeadlessCanvas`` and the relay runs on localhost.
+
+    brush.<kind>         one pointer move with each brush (events + render)
+    replay.<n>           GestureDrawingApp._apply_event over an n-event history
+    snapshot.<n>         chunking + packing an n-event state_snapshot
+    unpack.<n>           what the joining client pays to decode it
+    fanout.<clients>     server.handler relaying one stroke to every client
+
+Every result is "lower is better" time per operation.  ``--out`` writes
+them as JSON; ``--compare OLD.json`` prints the change against an earlier
+run and exits with status 1 if anything got slower than ``--threshold``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+from . import brushes, envelope
+from .config import COMPRESS_LEVEL, COMPRESS_THRESHOLD, SNAPSHOT_CHUNK_EVENTS
+from .headless import HeadlessCanvas
+from .stroke_store import UNIT_DIGITS, StrokeStore, scaled, snapshot_events
+
+GROUPS = ("brush", "replay", "snapshot", "fanout")
+
+Results = dict[str, dict]
+
+
+def _measure(fn: Callable[[], object], ops: int, repeat: int) -> tuple[float, float]:
+    """Best and median seconds per op over *repeat* runs of ``fn`` (= *ops* ops)."""
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - t0) / ops)
+    return min(runs), statistics.median(runs)
+
+
+def _result(best: float, median: float, unit: str = "us", **extra) -> dict:
+    scale = {"us": 1e6, "ms": 1e3}[unit]
+    return {"value": round(best * scale, 3), "median": round(median * scale, 3), "unit": f"{unit}/op", **extra}
+
+
+# ── WORKLOAD ───────────────────────────────────────────────────────────────────
+def synthetic_history(n: int, seed: int = 1) -> list[dict]:
+    """*n* events (in canvas units) from a random walk that switches brush every 50 moves."""
+    rng = random.Random(seed)
+    random.seed(seed)   # brushes use the module RNG for spray / jitter
+    kinds = list(brushes.BRUSHES)
+    stroke = brushes.Stroke()
+    x, y = 650.0, 350.0
+    history: list[dict] = []
+    move = 0
+    while len(history) < n:
+        kind = kinds[(move // 50) % len(kinds)]
+        x = min(1290.0, max(10.0, x + rng.uniform(-8, 8)))
+        y = min(690.0, max(10.0, y + rng.uniform(-8, 8)))
+        history += [scaled(ev, 1 / 1300, 1 / 700, UNIT_DIGITS)
+                    for ev in brushes.BRUSHES[kind].events(stroke, x, y, "black")]
+        stroke.prev = (x, y)
+        move += 1
+    return history[:n]
+
+
+def load_history(path: str) -> list[dict]:
+    data = json.loads(Path(path).read_text())
+    return snapshot_events(data) if isinstance(data, dict) else data
+
+
+# ── BENCHMARKS ─────────────────────────────────────────────────────────────────
+def bench_brushes(moves: int, repeat: int) -> Results:
+    out: Results = {}
+    for kind, style in brushes.BRUSHES.items():
+        canvas = HeadlessCanvas()
+        stroke = brushes.Stroke(prev=(100.0, 100.0))
+
+        def run() -> None:
+            x = 100.0
+            for i in range(moves):
+                x += 3.0
+                for ev in style.events(stroke, x, 100.0 + (i & 7), "black"):
+                    style.render(canvas, ev)
+                stroke.prev = (x, 100.0 + (i & 7))
+            canvas.items.clear()
+
+        out[f"brush.{kind}"] = _result(*_measure(run, moves, repeat))
+    return out
+
+
+def _headless_app():
+    from .gesture_app import GestureDrawingApp
+
+    # skip __init__ (camera, network, voice): _apply_event only needs a canvas
+    app = GestureDrawingApp.__new__(GestureDrawingApp)
+    app.canvas = HeadlessCanvas()
+    app.canvas_w, app.canvas_h = app.canvas.width, app.canvas.height
+    app.is_drawer = False
+    app._drawn = StrokeStore()
+    return app
+
+
+def bench_replay(histories: dict[str, list[dict]], repeat: int) -> Results:
+    app = _headless_app()
+    apply = app._apply_event
+    out: Results = {}
+    for name, history in histories.items():
+        def run() -> None:
+            for ev in history:
+                apply(ev)
+            app.canvas.items.clear()
+            app._drawn.clear()
+
+        out[f"replay.{name}"] = _result(*_measure(run, len(history), repeat), events=len(history))
+    return out
+
+
+def bench_snapshot(histories: dict[str, list[dict]], repeat: int) -> Results:
+    out: Results = {}
+    n = SNAPSHOT_CHUNK_EVENTS
+    for name, history in histories.items():
+        store = StrokeStore()
+        for ev in history:
+            store.append(ev)
+        frames: list = []
+
+        def pack() -> None:
+            # same split as GestureDrawingApp._send_snapshot
+            frames.clear()
+            frames.append(envelope.pack(
+                {"type": "state_snapshot", "drawer": "bench", "prompt": "Dog", "strokes": store.pack(0, n),
+                 "chunks": max(1, -(-len(store) // n)), "game_started": True, "round_active": True},
+                room="bench", sender="a", target="b",
+                compress_over=COMPRESS_THRESHOLD, compress_level=COMPRESS_LEVEL,
+            ))
+            for seq, start in enumerate(range(n, len(store), n), start=1):
+                frames.append(envelope.pack(
+                    {"type": "snapshot_chunk", "seq": seq, "strokes": store.pack(start, start + n)},
+                    room="bench", sender="a", target="b",
+                    compress_over=COMPRESS_THRESHOLD, compress_level=COMPRESS_LEVEL,
+                ))
+
+        def unpack() -> None:
+            for frame in frames:
+                snapshot_events(envelope.unpack(frame))
+
+        timing = _measure(pack, 1, repeat)
+        out[f"snapshot.{name}"] = _result(
+            *timing, unit="ms", events=len(history), frames=len(frames), bytes=sum(len(f) for f in frames),
+            store_bytes=store.nbytes(),
+        )
+        out[f"unpack.{name}"] = _result(*_measure(unpack, 1, repeat), unit="ms", events=len(history))
+    return out
+
+
+async def _fanout(clients: int, messages: int) -> float:
+    import websockets
+
+    from . import server
+    from .metrics import RelayMetrics
+
+    server.rooms.clear()
+    server.metrics = RelayMetrics()
+    async with websockets.serve(server.handler, "127.0.0.1", 0) as relay:
+        port = relay.sockets[0].getsockname()[1]
+        socks = []
+        for i in range(clients + 1):
+            ws = await websockets.connect(f"ws://127.0.0.1:{port}", max_size=None)
+            await ws.send(envelope.pack({"type": "hello", "id": f"c{i}"}, room="bench", sender=f"c{i}"))
+            await ws.recv()   # welcome: registered, so it won't miss the first strokes
+            socks.append(ws)
+        sender, receivers = socks[0], socks[1:]
+
+        async def drain(ws) -> None:
+            got = 0
+            while got < messages:
+                if envelope.peek(await ws.recv()).type == "line":
+                    got += 1
+
+        frame = envelope.pack({"type": "line", "coords": [1, 2, 3, 4], "colour": "black", "width": 3},
+                              room="bench", sender="c0")
+        waiting = [asyncio.create_task(drain(ws)) for ws in receivers]
+        t0 = time.perf_counter()
+        for _ in range(messages):
+            await sender.send(frame)
+        await asyncio.gather(*waiting)
+        elapsed = time.perf_counter() - t0
+        for ws in socks:
+            await ws.close()
+    return elapsed / messages
+
+
+def bench_fanout(client_counts: list[int], messages: int, repeat: int) -> Results:
+    out: Results = {}
+    for n in client_counts:
+        runs = [asyncio.run(_fanout(n, messages)) for _ in range(repeat)]
+        out[f"fanout.{n}"] = _result(min(runs), statistics.median(runs), clients=n, messages=messages)
+    return out
+
+
+# ── REPORTING ──────────────────────────────────────────────────────────────────
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=Path(__file__).parent, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(new: Results, old: Results, threshold: float) -> list[str]:
+    """Print new vs old; return the names that regressed by more than *threshold* %."""
+    regressions = []
+    print(f"\n{'benchmark':<22}{'old':>12}{'new':>12}{'change':>10}")
+    for name in sorted(new.keys() & old.keys()):
+        a, b = old[name]["value"], new[name]["value"]
+        change = (b - a) / a * 100 if a else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  ← slower"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{name:<22}{a:>12.3f}{b:>12.3f}{change:>+9.1f}%{flag}")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Headless gesture_drawing benchmarks")
+    parser.add_argument("--only", default=",".join(GROUPS), help=f"Comma-separated subset of {GROUPS}")
+    parser.add_argument("--quick", action="store_true", help="Smaller workloads, fewer repeats")
+    parser.add_argument("--history", nargs="*", default=[], metavar="FILE",
+                        help="Recorded histories (JSON event list or state_snapshot) to replay as well")
+    parser.add_argument("--clients", default="1,10,50", help="Client counts for the fan-out benchmark")
+    parser.add_argument("--out", metavar="FILE", help="Write results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="Earlier --out file to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Percent slowdown that counts as a regression (default 10)")
+    args = parser.parse_args(argv)
+
+    only = set(args.only.split(","))
+    repeat = 3 if args.quick else 7
+    sizes = (1_000, 10_000) if args.quick else (1_000, 10_000, 50_000)
+    histories = {str(n): synthetic_history(n) for n in sizes}
+    histories |= {Path(p).stem: load_history(p) for p in args.history}
+
+    results: Results = {}
+    skipped: dict[str, str] = {}
+    runners = {
+        "brush": lambda: bench_brushes(500 if args.quick else 2000, repeat),
+        "replay": lambda: bench_replay(histories, repeat),
+        "snapshot": lambda: bench_snapshot(histories, repeat),
+        "fanout": lambda: bench_fanout([int(c) for c in args.clients.split(",")],
+                                       100 if args.quick else 500, 3 if args.quick else 5),
+    }
+    for group in GROUPS:
+        if group not in only:
+            continue
+        print(f"[bench] {group} …", file=sys.stderr)
+        try:
+            results |= runners[group]()
+        except ImportError as e:   # e.g. no cv2/mediapipe for replay, no websockets for fan-out
+            skipped[group] = str(e)
+            print(f"[bench] {group} skipped: {e}", file=sys.stderr)
+
+    for name, r in results.items():
+        print(f"{name:<22}{r['value']:>12.3f} {r['unit']}")
+
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": args.quick,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2))
+        print(f"[bench] wrote {args.out}", file=sys.stderr)
+    if args.compare:
+        old = json.loads(Path(args.compare).read_text())["results"]
+        if compare(results, old, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
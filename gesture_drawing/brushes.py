@@ -0,0 +1,184 @@
+# brushes.py
+
+"""Brush registry: each brush says once how it draws.
+
+A brush turns a pointer move into wire events (:meth:`BrushStyle.events`)
+and draws one such event on a canvas (:meth:`BrushStyle.render`).  Local
+drawing renders the events it generates and broadcasts them; remote events
+and history replay go straight to ``render`` through ``RENDERERS`` – one
+dict lookup per event, built once at import.
+"""
+from __future__ import annotations
+
+import math
+import random
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable
+
+Canvas = Any   # tk.Canvas, or anything with the same create_* methods
+
+
+@dataclass(slots=True)
+class Stroke:
+    """Pointer state carried from one move of a stroke to the next."""
+    prev: tuple[float, float] | None = None
+    last_time: float | None = None
+
+
+class BrushStyle(ABC):
+    kind = ""     # BrushType value
+    event = ""    # wire "type" of the events it produces
+    geometry = "coords"   # key of the event's coordinate list
+
+    @abstractmethod
+    def events(self, stroke: Stroke, x: float, y: float, colour: str) -> list[dict]:
+        ...
+
+    @abstractmethod
+    def render(self, canvas: Canvas, ev: dict) -> None:
+        ...
+
+
+class Solid(BrushStyle):
+    kind, event = "solid", "line"
+    width = 3
+
+    def events(self, stroke, x, y, colour):
+        if not stroke.prev:
+            return []
+        return [{"type": "line", "coords": [*stroke.prev, x, y], "colour": colour, "width": self.width}]
+
+    def render(self, canvas, ev):
+        canvas.create_line(*ev["coords"], fill=ev.get("colour", "black"),
+                           width=ev.get("width", 2), tags="drawing")
+
+
+class Air(BrushStyle):
+    kind = event = "air"
+    dots, spread, size = 20, 10, 3
+
+    def events(self, stroke, x, y, colour):
+        out = []
+        for _ in range(self.dots):
+            angle = random.uniform(0, 2 * math.pi)
+            radius = random.uniform(0, self.spread)
+            ox = int(x + math.cos(angle) * radius)
+            oy = int(y + math.sin(angle) * radius)
+            out.append({"type": "air", "coords": [ox, oy, ox + self.size, oy + self.size], "colour": colour})
+        return out
+
+    def render(self, canvas, ev):
+        canvas.create_oval(*ev["coords"], fill=ev["colour"], tags="drawing")
+
+
+class Texture(BrushStyle):
+    kind = event = "texture"
+
+    def events(self, stroke, x, y, colour):
+        return [{"type": "texture", "coords": [x, y], "colour": colour}]
+
+    def render(self, canvas, ev):
+        x, y = ev["coords"]
+        canvas.create_text(x, y, text="✶", fill=ev["colour"], font=("Arial", 10), tags="drawing")
+
+
+class Calligraphy(BrushStyle):
+    """Nib at 45°; the faster the hand moves, the thinner the stroke."""
+
+    kind = event = "calligraphy"
+    geometry = "polygon"
+    max_width, min_width, width_scaling = 25, 5, 1.0
+
+    def _width(self, stroke: Stroke, x: float, y: float) -> float:
+        now = time.time()
+        if stroke.last_time is None or stroke.prev is None:
+            stroke.last_time = now
+            return self.max_width
+        dt = now - stroke.last_time or 1e-5
+        speed = math.hypot(x - stroke.prev[0], y - stroke.prev[1]) / dt
+        stroke.last_time = now
+        return max(self.min_width, self.max_width - speed * self.width_scaling)
+
+    def events(self, stroke, x, y, colour):
+        if not stroke.prev:
+            return []
+        offset = self._width(stroke, x, y) / 2
+        px, py = stroke.prev
+        dx, dy = x - px, y - py
+        if math.hypot(dx, dy) < 1:
+            return []
+        angle = math.atan2(dy, dx) + math.pi / 4
+        ox, oy = offset * math.cos(angle), offset * math.sin(angle)
+        poly = (
+            px - ox, py - oy,
+            px + ox, py + oy,
+            x + ox, y + oy,
+            x - ox, y - oy,
+        )
+        return [{"type": "calligraphy", "polygon": poly, "colour": colour}]
+
+    def render(self, canvas, ev):
+        canvas.create_polygon(*ev["polygon"], fill=ev["colour"], outline=ev["colour"], tags="drawing")
+
+
+class Blending(BrushStyle):
+    kind = event = "blending"
+    blobs, jitter, radius = 10, 3, 5
+
+    def events(self, stroke, x, y, colour):
+        j = self.jitter
+        return [
+            {"type": "blending", "coords": [x + random.randint(-j, j), y + random.randint(-j, j)], "colour": colour}
+            for _ in range(self.blobs)
+        ]
+
+    def render(self, canvas, ev):
+        x, y = ev["coords"]
+        r = self.radius
+        canvas.create_oval(x - r, y - r, x + r, y + r, fill=ev["colour"], outline="",
+                           stipple="gray50", tags="drawing")
+
+
+def _ray_offsets(rays: int, length: float) -> list[tuple[float, float]]:
+    return [(length * math.cos(2 * math.pi * i / rays), length * math.sin(2 * math.pi * i / rays))
+            for i in range(rays)]
+
+
+class Shining(BrushStyle):
+    kind = event = "shining"
+    geometry = "center"
+    rays, length = 8, 10
+    _RAYS = _ray_offsets(rays, length)   # once, not per event
+
+    def events(self, stroke, x, y, colour):
+        return [{"type": "shining", "center": [x, y], "colour": colour}]
+
+    def render(self, canvas, ev):
+        x, y = ev["center"]
+        colour = ev["colour"]
+        for dx, dy in self._RAYS:
+            canvas.create_line(x, y, x + dx, y + dy, fill=colour, tags="drawing")
+        canvas.create_oval(x - 2, y - 2, x + 2, y + 2, fill=colour, outline="", tags="drawing")
+
+
+class Eraser(BrushStyle):
+    kind = event = "eraser"
+    width = 20
+
+    def events(self, stroke, x, y, colour):
+        if not stroke.prev:
+            return []
+        return [{"type": "eraser", "coords": [*stroke.prev, x, y], "width": self.width}]
+
+    def render(self, canvas, ev):
+        canvas.create_line(*ev["coords"], width=ev["width"], fill=canvas["bg"], tags="drawing")
+
+
+# kind → brush, for local drawing
+BRUSHES: dict[str, BrushStyle] = {
+    b.kind: b for b in (Solid(), Air(), Texture(), Calligraphy(), Blending(), Shining(), Eraser())
+}
+# wire event type → renderer, for remote events and replay
+RENDERERS: dict[str, Callable[[Canvas, dict], None]] = {b.event: b.render for b in BRUSHES.values()}
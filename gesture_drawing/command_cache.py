@@ -0,0 +1,108 @@
+# command_cache.py
+
+"""Persistent (SQLite) cache of LLM-normalised voice commands.
+
+Entries are keyed on ``(mode, prompt version, normalised transcript)`` so a
+prompt edit invalidates its old answers, and survive restarts so a phrase
+is sent to the LLM at most once.  The table is capped at ``max_entries``;
+the least recently used rows are evicted first.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_PATH = Path(
+    os.environ.get("GESTURE_CACHE_PATH", Path.home() / ".cache" / "gesture_drawing" / "commands.sqlite")
+)
+
+MISS = object()
+
+
+def prompt_version(prompt: str) -> str:
+    """Short content hash – changes whenever the prompt text does."""
+    return hashlib.sha1(prompt.encode()).hexdigest()[:12]
+
+
+class CommandCache:
+    def __init__(self, path: str | Path = DEFAULT_PATH, max_entries: int = 5000) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        try:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+            self._setup()   # a corrupt file only fails here
+        except (OSError, sqlite3.Error) as e:
+            print(f"[command_cache] {path} unusable ({e}); caching in memory only")
+            if getattr(self, "_db", None) is not None:
+                self._db.close()
+            self._db = sqlite3.connect(":memory:", check_same_thread=False, isolation_level=None)
+            self._setup()
+
+    def _setup(self) -> None:
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS commands (
+                   mode      TEXT NOT NULL,
+                   version   TEXT NOT NULL,
+                   text      TEXT NOT NULL,
+                   reply     TEXT,             -- NULL = "no command"
+                   last_used REAL NOT NULL,
+                   PRIMARY KEY (mode, version, text)
+               ) WITHOUT ROWID"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS commands_lru ON commands (last_used)")
+
+    def get(self, mode: str, version: str, text: str):
+        """Cached reply (may be ``None``) or the ``MISS`` sentinel."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT reply FROM commands WHERE mode=? AND version=? AND text=?",
+                (mode, version, text),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return MISS
+            self.hits += 1
+            self._db.execute(
+                "UPDATE commands SET last_used=? WHERE mode=? AND version=? AND text=?",
+                (time.time(), mode, version, text),
+            )
+            return row[0]
+
+    def put(self, mode: str, version: str, text: str, reply: str | None) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO commands VALUES (?, ?, ?, ?, ?)",
+                (mode, version, text, reply, time.time()),
+            )
+            (count,) = self._db.execute("SELECT COUNT(*) FROM commands").fetchone()
+            if count > self.max_entries:
+                # drop the oldest 10 % in one go rather than one row per insert
+                self._db.execute(
+                    "DELETE FROM commands WHERE (mode, version, text) IN ("
+                    " SELECT mode, version, text FROM commands ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries + self.max_entries // 10,),
+                )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM commands")
+
+    def stats(self) -> dict:
+        with self._lock:
+            (size,) = self._db.execute("SELECT COUNT(*) FROM commands").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": size,
+        }
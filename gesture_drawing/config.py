@@ -2,4 +2,20 @@ API_KEY = "gsk_8B..." # Replace with your actual API key
 API_URL = "https://api.groq.com/openai/v1/chat/completions" 
 
 # Replace with the actual IP address of the server host or "localhost" if you are running the server locally
-IP4_ADDRESS_OF_SERVER_HOST = "192.XXX.XXX.XXX" 
\ No newline at end of file
+IP4_ADDRESS_OF_SERVER_HOST = "192.XXX.XXX.XXX"
+
+# Games on the same server are isolated by room; everybody in one game uses the same name
+ROOM = "lobby"
+
+# Websocket tuning (network.py / server.py)
+WS_COMPRESSION = None           # "deflate" = permessage-deflate on *every* frame, even tiny cursors
+COMPRESS_THRESHOLD = 2048       # payloads above this many bytes are zlib-compressed instead
+COMPRESS_LEVEL = 1              # zlib level for those: fast, the columns are dense already
+MAX_FRAME_SIZE = 16 * 2**20     # largest accepted websocket message, bytes
+SNAPSHOT_CHUNK_EVENTS = 500     # history events per state_snapshot / snapshot_chunk message
+SPECTATOR_INTERVAL_S = 0.25     # relay → spectator batch period (see spectators.py)
+
+# Remote playout (jitter.py): peers' strokes/cursors are drawn this far behind
+# the sender so they can be smoothed; cursors are sent at most this often
+REMOTE_DELAY_S = 0.1
+CURSOR_SEND_HZ = 15
@@ -1,17 +1,41 @@
 # drawing.py
 
-"""Generic Tkinter canvas that other classes can extend."""
+"""Generic Tkinter canvas that other classes can extend.
+
+The canvas size is cached from ``<Configure>`` events, so mapping a point
+never asks Tk; subclasses redraw in :meth:`DrawingApp.on_resize`.
+"""
 from __future__ import annotations
 
 import tkinter as tk
 from tkinter import BOTH, Canvas
 
+RESIZE_REDRAW_MS = 100   # a drag-resize fires <Configure> per pixel – redraw once it settles
+
 
 class DrawingApp:  # noqa: D101 (simple base‑class)
     def __init__(self, master: tk.Tk | tk.Toplevel) -> None:
         self.master = master
         self.canvas: Canvas = tk.Canvas(self.master, bg="white", width=1300, height=700)
         self.canvas.pack(fill=BOTH, expand=True)
+        self.canvas_w, self.canvas_h = 1300, 700   # until the first <Configure>
+        self._resize_job: str | None = None
+        self.canvas.bind("<Configure>", self._on_configure)
+
+    def _on_configure(self, event: tk.Event) -> None:
+        if (event.width, event.height) == (self.canvas_w, self.canvas_h):
+            return
+        self.canvas_w, self.canvas_h = max(event.width, 1), max(event.height, 1)
+        if self._resize_job is not None:
+            self.master.after_cancel(self._resize_job)
+        self._resize_job = self.master.after(RESIZE_REDRAW_MS, self._resized)
+
+    def _resized(self) -> None:
+        self._resize_job = None
+        self.on_resize()
+
+    def on_resize(self) -> None:
+        """The canvas changed size (already in ``canvas_w`` / ``canvas_h``)."""
 
     # -----------------------------------------------------------------
     # Mouse fallback – *unused* in the gesture UI but handy for testing.
@@ -38,6 +62,4 @@ class DrawingApp:  # noqa: D101 (simple base‑class)
 
     # Mapping helpers for camera→canvas coordinates – used by subclasses.
     def to_canvas(self, x: int, y: int, *, frame_w: int, frame_h: int) -> tuple[int, int]:
-        w = self.canvas.winfo_width() or 1  # avoid division‑by‑zero on startup
-        h = self.canvas.winfo_height() or 1
-        return int(x * w / frame_w), int(y * h / frame_h)
\ No newline at end of file
+        return int(x * self.canvas_w / frame_w), int(y * self.canvas_h / frame_h)
\ No newline at end of file
@@ -0,0 +1,97 @@
+# envelope.py
+
+"""Wire format shared by ``network.py`` (clients) and ``server.py`` (relay).
+
+Every frame is one header line followed by the JSON payload::
+
+    <type>\\t<room>\\t<sender>\\t<target>[\\t<key>]\\n{"type": "line", ...}
+
+The relay routes on the header alone and forwards the frame untouched, so
+it never has to ``json.loads``/``json.dumps`` drawing traffic.  ``key`` is
+optional: cursor frames carry the cursor id there (one per tracked hand),
+so the spectator feed can keep the latest cursor of each.
+
+Payloads above a size threshold (snapshots, long histories) are sent as a
+*binary* frame whose body is zlib-compressed; the header stays plain text
+so the relay can still route them without inflating anything.
+"""
+from __future__ import annotations
+
+import json
+import zlib
+from typing import NamedTuple
+
+SEP = "\t"
+
+
+class Envelope(NamedTuple):
+    type: str
+    room: str = ""
+    sender: str = ""
+    target: str = ""  # "" → broadcast to the room
+    key: str = ""     # cursors: which one (a sender may have several)
+
+
+def _clean(field: str) -> str:
+    return field.replace(SEP, " ").replace("\n", " ")
+
+
+def pack(
+    payload: dict,
+    *,
+    room: str = "",
+    sender: str = "",
+    target: str = "",
+    key: str = "",
+    compress_over: int | None = None,
+    compress_level: int = 6,
+) -> str | bytes:
+    body = json.dumps(payload, separators=(",", ":"))
+    return pack_body(
+        payload.get("type", "?"), body, room=room, sender=sender, target=target, key=key,
+        compress_over=compress_over, compress_level=compress_level,
+    )
+
+
+def pack_body(
+    type_: str,
+    body: str,
+    *,
+    room: str = "",
+    sender: str = "",
+    target: str = "",
+    key: str = "",
+    compress_over: int | None = None,
+    compress_level: int = 6,
+) -> str | bytes:
+    """Like :func:`pack` for a payload that is already JSON text."""
+    fields = (type_, room, sender, target, key) if key else (type_, room, sender, target)
+    header = SEP.join(map(_clean, fields))
+    if compress_over is not None and len(body) > compress_over:
+        return f"{header}\n".encode() + zlib.compress(body.encode(), compress_level)
+    return f"{header}\n{body}"
+
+
+def peek(frame: str | bytes) -> Envelope:
+    """Read the routing header without touching the payload."""
+    if isinstance(frame, bytes):
+        return Envelope(*frame[:frame.index(b"\n")].decode().split(SEP, 4))
+    if frame.startswith("{"):  # legacy bare-JSON client
+        data = json.loads(frame)
+        return Envelope(data.get("type", "?"), data.get("room", ""), data.get("id", ""), data.get("to", ""))
+    header, _, _ = frame.partition("\n")
+    return Envelope(*header.split(SEP, 4))
+
+
+def body(frame: str | bytes) -> str:
+    """The payload's JSON text, inflated if need be but not parsed."""
+    if isinstance(frame, bytes):
+        return zlib.decompress(frame[frame.index(b"\n") + 1:]).decode()
+    if frame.startswith("{"):
+        return frame
+    return frame[frame.index("\n") + 1:]
+
+
+def unpack(frame: str | bytes) -> dict:
+    """Decode the payload of a frame (header is skipped, not parsed)."""
+    return json.loads(body(frame))
@@ -2,26 +2,43 @@
 from __future__ import annotations
 
 from . import network
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from queue import Queue
 import uuid
 import math
-import random
 import time
 import tkinter as tk
-from PIL import Image, ImageTk
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import Any, Iterable, Sequence
-from .config import IP4_ADDRESS_OF_SERVER_HOST
-
-import cv2
-import mediapipe as mp
+from typing import Any, Iterable
+from .config import (
+    IP4_ADDRESS_OF_SERVER_HOST, SNAPSHOT_CHUNK_EVENTS, REMOTE_DELAY_S, CURSOR_SEND_HZ, SPECTATOR_INTERVAL_S,
+)
 
 from .drawing import DrawingApp
-from .voice import listen_for_commands, USE_LLM
+from . import brushes, gestures, hand_tracking, latency, profiler, recording, voice, voice_process, words
+from .stroke_store import UNIT_DIGITS, StrokeStore, scaled, snapshot_events
+from .jitter import CursorTrack, JitterBuffer
 
 __all__ = ["GestureDrawingApp"]
 
+# OpenCV, MediaPipe and PIL take seconds to import: _import_vision() runs on
+# a worker thread once the window is up (see GestureDrawingApp._load_vision).
+cv2: Any = None
+mp: Any = None
+Image: Any = None
+ImageTk: Any = None
+
+
+def _import_vision() -> None:
+    global cv2, mp, Image, ImageTk
+    import cv2 as _cv2
+    import mediapipe as _mp
+    from PIL import Image as _Image, ImageTk as _ImageTk
+
+    cv2, mp, Image, ImageTk = _cv2, _mp, _Image, _ImageTk
+
 
 class BrushType(str, Enum):
     SOLID = "solid"
@@ -39,57 +56,34 @@ class Brush:
     colour: str = "black"
 
 
-_PROMPTS: Sequence[str] = (
-    "Dog",
-    "Fish",
-    "Bird",
-    "House",
-    "Star",
-    "Heart",
-    "Cloud",
-    "Flower",
-    "Apple",
-    "Boat",
-    "Cup",
-    "Key",
-    "Book",
-    "Moon",
-    "Tree",
-    "Car",
-    "Cat",
-    "Chair",
-    "Shoe",
-    "Hat",
-    "Bed",
-    "Cake",
-    "Bell",
-    "Box",
-    "Pen",
-    "Egg",
-    "Leaf",
-    "Nose",
-    "Fork",
-    "Hand",
-    "Ring",
-    "Football",
-    "Table",
-    "Elephant",
-    "Guitar",
-    "Piano",
-    "Lion",
-)
+# Time one _poll_network tick may spend drawing remote events; whatever is
+# left over (e.g. a long history after joining) continues on the next tick.
+_NET_BUDGET_S = 0.008
+
+# a remote cursor / stroke buffer not heard from for this long is dropped
+_QUIET_S = 3.0
+
+# fingertip pointer per tracked hand (remote cursors are blue)
+_POINTER_COLOURS = ("red", "green3", "dark orange", "purple")
 
 
 
 class GestureDrawingApp(DrawingApp):
     """Tkinter window driven by hand‑gestures and voice commands."""
 
+    # a no-op unless --record; class-level so bare instances (bench, replay) have one too
+    _rec = recording.NULL
+    spectating = False
+
     # ------------------------------ life‑cycle ------------------------------
-    def __init__(self, master: tk.Tk | tk.Toplevel) -> None:
+    def __init__(self, master: tk.Tk | tk.Toplevel, spectate: bool = False) -> None:
+        """*spectate*: read-only view of the room – no camera, voice or input."""
         super().__init__(master)
 
         self.master = master
-        self.event_history: list[dict] = [] 
+        self.spectating = spectate
+        self.event_history = StrokeStore()
+        self._drawn = StrokeStore()   # strokes / shapes on the canvas now, redrawn on resize
 
         self._start_reminder_id: str | None = None
         self._next_drawer: str | None = None
@@ -107,52 +101,59 @@ class GestureDrawingApp(DrawingApp):
 
         self._queue_prompt_hide = queue_prompt_hide  # save as method
 
+        self._prof = profiler.get()
+        self._rec = recording.get()
         self.client_id = str(uuid.uuid4())
         self.remote_cursors: dict[str, int] = {}  # maps peer_id → canvas item
+        self._pending_events: deque[tuple[str | None, dict]] = deque()   # (sender, event), not yet applied
+        # remote lines/cursors are played out REMOTE_DELAY_S behind the sender
+        # (spectators get them in batches, so one batch period later still)
+        self._playout_delay = REMOTE_DELAY_S + (SPECTATOR_INTERVAL_S if spectate else 0.0)
+        self._line_buffers: dict[str, JitterBuffer] = {}   # per sender: each has its own clock
+        self._cursor_tracks: dict[str, CursorTrack] = {}
 
         self.current_drawer: str = self.client_id  # I start as drawer
-        self.is_drawer: bool = True
-        self.current_prompt: str = random.choice(_PROMPTS)
+        self.is_drawer: bool = not spectate
+        self._words = words.get_index()
+        self._prompts = words.PromptPicker(self._words.words)
+        self.current_prompt: str = self._prompts.pick()
         self.round_active = False
-        self.prompt_visible = True
-
-        self.master.bind_all("<KeyPress-space>", self._on_space)
-        self.master.bind("<ButtonPress-1>", self._on_mouse_down)
-        self.master.bind("<B1-Motion>", self._on_mouse_drag)
-        self.master.bind("<ButtonRelease-1>", self._on_mouse_up)
-
-        # create a small video widget…
-        self.video_label = tk.Label(self.master, bd=2, relief="sunken")
-        # …and place it over the canvas at bottom-right
-        self.video_label.place(
-            relx=1.0, rely=1.0,  # relative to bottom-right of master
-            anchor="se",  # align its south-east corner
-            width=288, height=162  # whatever small size you like
-        )
+        self.prompt_visible = not spectate
+
+        if not spectate:
+            self.master.bind_all("<KeyPress-space>", self._on_space)
+            self.master.bind("<ButtonPress-1>", self._on_mouse_down)
+            self.master.bind("<B1-Motion>", self._on_mouse_drag)
+            self.master.bind("<ButtonRelease-1>", self._on_mouse_up)
+
+            # create a small video widget…
+            self.video_label = tk.Label(self.master, bd=2, relief="sunken")
+            # …and place it over the canvas at bottom-right
+            self.video_label.place(
+                relx=1.0, rely=1.0,  # relative to bottom-right of master
+                anchor="se",  # align its south-east corner
+                width=288, height=162  # whatever small size you like
+            )
 
         # start network client (point to your server)
         network.start_client(f"ws://{IP4_ADDRESS_OF_SERVER_HOST}:6789")
         self.master.after(20, self._poll_network)
+        self.master.after(16, self._render_remote)
 
-        master.title("Gesture Drawing Application")
+        master.title("Gesture Drawing Application" + (f" – spectating {network.ROOM!r}" if spectate else ""))
 
-        # --- camera & MediaPipe setup --------------------------------------
-        self.cap = cv2.VideoCapture(0)
-        if not self.cap.isOpened():
-            raise RuntimeError("Cannot open webcam – aborting")
-        self._mphands = mp.solutions.hands
-        self._hands = self._mphands.Hands()
-        self._mpdraw = mp.solutions.drawing_utils
+        # --- camera & MediaPipe setup (in the background) -----------------
+        self.cap = None
+        self._hands = None
+        if not spectate:
+            loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vision")
+            self._vision: Future = loader.submit(self._load_vision)
+            loader.shutdown(wait=False)
+            self._loading_dots = 0
 
         # --- drawing‑state --------------------------------------------------
-        self.brush = Brush()
-        self.prev_coord: tuple[int, int] | None = None
-        self.pointer_id: int | None = None  # canvas item id for fingertip
-        self.last_time: float | None = None
-        self.eraser_width = 20
-        self.max_calligraphy_width = 25
-        self.min_calligraphy_width = 5
-        self.width_scaling = 1.0
+        self._tracker = hand_tracking.HandTracker(Brush())   # per-hand pointer, brush, stroke
+        self.stroke = brushes.Stroke()                          # mouse drawing
 
         # --- feature toggles ----------------------------------------------
         self.drawing_enabled = False
@@ -164,21 +165,102 @@ class GestureDrawingApp(DrawingApp):
         self.instruction_text = self.canvas.create_text(
             self.master.winfo_width() * 5 // 3,
             30,
-            text=self._instruction_banner("Say 'START' to begin the game."),
+            text=self._instruction_banner(
+                "Spectating – waiting for the drawer…" if spectate else "Say 'START' to begin the game."
+            ),
             font=("Arial", 15),
             fill="black",
             anchor="n",
             justify="center",
         )
 
+        if latency.OVERLAY:
+            self.master.after(1000, self._refresh_latency_overlay)
+        if profiler.ENABLED:
+            self.master.after(500, self._refresh_profiler_hud)
+
         self.master.focus_force()
+        if spectate:
+            return
 
         # Start asynchronous voice listener
-        listen_for_commands(self._handle_command)
-
-        # Kick‑off periodic update loop
+        if voice_process.ENABLED:
+            voice_process.start(self.master, self._handle_command, lambda: self.voice_mode)
+        else:
+            voice.listen_for_commands(self._handle_command, lambda: self.voice_mode)
+
+        # the camera loop starts once _load_vision is done
+        self._await_vision()
+
+    def _load_vision(self) -> tuple[Any, Any]:
+        """Worker thread: the heavy imports, opening the webcam, the hand model."""
+        t0 = time.perf_counter()
+        _import_vision()
+        cap = cv2.VideoCapture(0)
+        if not cap.isOpened():
+            raise RuntimeError("Cannot open webcam")
+        hands = mp.solutions.hands.Hands(max_num_hands=hand_tracking.MAX_HANDS)
+        print(f"Camera and hand model ready in {time.perf_counter() - t0:.1f}s")
+        return cap, hands
+
+    def _await_vision(self) -> None:
+        if not self._vision.done():
+            self._loading_dots = (self._loading_dots + 1) % 4
+            self.video_label.configure(text="Loading camera\nand hand model" + "." * self._loading_dots)
+            self.master.after(250, self._await_vision)
+            return
+        try:
+            self.cap, self._hands = self._vision.result()
+        except Exception as e:   # mouse drawing and voice still work
+            print(f"Camera unavailable: {e}")
+            self.video_label.configure(text=f"Camera unavailable:\n{e}")
+            return
+        self._mphands = mp.solutions.hands
+        self._mpdraw = mp.solutions.drawing_utils
+        self.video_label.configure(text="")
         self._update_frame()
 
+    @property
+    def brush(self) -> Brush:
+        """The brush commands change: that of the hand that drew last."""
+        return self._tracker.brush
+
+    @property
+    def voice_mode(self) -> str:
+        """Which commands a spoken phrase can mean right now (grammar.MODES)."""
+        if not self.is_drawer:
+            return "guess"
+        if self.square_drawing_enabled or self.circle_drawing_enabled:
+            return "place"
+        return "draw"
+
+    def _refresh_latency_overlay(self) -> None:
+        # redrawn every second; clear_canvas() may have wiped the old item
+        self.canvas.delete("latency_overlay")
+        summary = latency.tracker.summary_line() or "voice latency: no commands yet"
+        self.canvas.create_text(
+            10, self.canvas_h - 10,
+            text=summary.replace(" | ", "\n"),
+            font=("Courier", 10),
+            fill="grey30",
+            anchor="sw",
+            tags="latency_overlay",
+        )
+        self.master.after(1000, self._refresh_latency_overlay)
+
+    def _refresh_profiler_hud(self) -> None:
+        self.canvas.delete("profiler_hud")
+        self.canvas.create_text(
+            10, 10,
+            text=self._prof.hud_text(),
+            font=("Courier", 10),
+            fill="grey20",
+            anchor="nw",
+            tags="profiler_hud",
+        )
+        self.canvas.tag_raise("profiler_hud")
+        self.master.after(500, self._refresh_profiler_hud)
+
     def _hide_prompt_if_still_pending(self):
         # only hide the prompt if it’s still shown and drawing hasn’t started
         if self.prompt_visible and not self.drawing_enabled:
@@ -201,7 +283,7 @@ class GestureDrawingApp(DrawingApp):
     def _on_mouse_down(self, event):
         if not self.is_drawer or not self._game_started:
             return
-        self.prev_coord = (event.x, event.y)
+        self.stroke.prev = (event.x, event.y)
 
     def _on_mouse_drag(self, event):
         if not self.is_drawer or not self._game_started:
@@ -209,24 +291,10 @@ class GestureDrawingApp(DrawingApp):
 
         x, y = event.x, event.y
 
-        # dispatch to the appropriate draw func, which
-        # also takes care of broadcasting
-        draw_func = {
-            BrushType.SOLID:       self._draw_solid,
-            BrushType.AIR:         self._draw_air,
-            BrushType.TEXTURE:     self._draw_texture,
-            BrushType.CALLIGRAPHY: self._draw_calligraphy,
-            BrushType.BLENDING:    self._draw_blending,
-            BrushType.SHINING:     self._draw_shining,
-            BrushType.ERASER:      self._draw_eraser,
-        }[self.brush.kind]
-
-        # call it; it uses self.prev_coord internally
-        draw_func(x, y)
-        # no need to manually broadcast here
-
-        # update prev_coord so next segment is continuous
-        self.prev_coord = (x, y)
+        # draws locally and broadcasts
+        self._paint(x, y)
+        # update the stroke so the next segment is continuous
+        self.stroke.prev = (x, y)
 
     def _on_mouse_up(self, _event: tk.Event) -> None:
         if not self.is_drawer or not self._game_started:
@@ -244,6 +312,8 @@ class GestureDrawingApp(DrawingApp):
 
     def _refresh_instruction(self, *extra_lines: str) -> None:
         """Update the instruction text, optionally hiding the prompt line."""
+        if self.spectating:   # the player prompts ("say your guess") are not for us
+            extra_lines = ("Spectating – read-only",)
         lines = []
         if self.prompt_visible:
             lines.append(f"Draw: {self.current_prompt}")
@@ -345,7 +415,7 @@ class GestureDrawingApp(DrawingApp):
 
     def _send_guess(self, guess: str):
         # evaluate locally
-        correct = (guess.lower() == self.current_prompt.lower())
+        correct = self._words.is_match(guess, self.current_prompt)
         # broadcast my guess + my id
         self._broadcast({
             "type": "guess",
@@ -356,7 +426,7 @@ class GestureDrawingApp(DrawingApp):
             # on correct guess: schedule me as next drawer, but don't start yet
             self._next_drawer = self.client_id
             self.round_active = False
-            self.canvas.delete("drawing")
+            self._clear_drawing()
             self.prompt_visible = False
             self._refresh_instruction("✔ You were right! Say 'START' to draw next.")
 
@@ -385,10 +455,10 @@ class GestureDrawingApp(DrawingApp):
             self._refresh_instruction(f"{shape.capitalize()} finalised. Say '{shape.upper()}' to start anew.")
 
     def _evaluate_guess(self, guess: str) -> None:
-        if guess.lower() == self.current_prompt.lower():
+        if self._words.is_match(guess, self.current_prompt):
             self._refresh_instruction(f"✔ Correct! It *was* {self.current_prompt}. Picked a new one.")
-            self.canvas.delete("drawing")
-            self.current_prompt = random.choice(_PROMPTS)
+            self._clear_drawing()
+            self.current_prompt = self._prompts.pick()
             self.drawing_enabled = False
 
     def _change_colour(self, colour: str) -> None:
@@ -401,217 +471,132 @@ class GestureDrawingApp(DrawingApp):
 
     # ------------------------------ camera loop ---------------------------
     def _update_frame(self) -> None:
-        ok, frame = self.cap.read()
-        if not ok:
-            return
-        # flip so it’s a mirror view
-        frame = cv2.flip(frame, 1)
-        self.frame = frame
+        prof = self._prof
+        prof.frame()
+        with prof.span("capture"):
+            ok, frame = self.cap.read()
+            if not ok:
+                return
+            # flip so it’s a mirror view
+            frame = cv2.flip(frame, 1)
+            self.frame = frame
 
         # 1) run Mediapipe on the flipped frame
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        result = self._hands.process(rgb)
+        with prof.span("inference"):
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            result = self._hands.process(rgb)
 
-        # 2) if there's a hand, handle it (this will draw on the Tkinter canvas)
-        if result.multi_hand_landmarks:
-            lm = result.multi_hand_landmarks[0]
-            self._handle_hand(lm, frame.shape)
+        # 2) every hand found moves its own pointer (and draws on the Tkinter canvas)
+        with prof.span("hand"):
+            self._handle_hands(result.multi_hand_landmarks or [], result.multi_handedness or [], frame.shape)
 
-        # 3) draw the landmark overlay on the frame itself for display
-        if result.multi_hand_landmarks:
-            for lm in result.multi_hand_landmarks:
-                self._mpdraw.draw_landmarks(frame, lm, self._mphands.HAND_CONNECTIONS)
+        with prof.span("preview"):
+            # 3) draw the landmark overlay on the frame itself for display
+            if result.multi_hand_landmarks:
+                for lm in result.multi_hand_landmarks:
+                    self._mpdraw.draw_landmarks(frame, lm, self._mphands.HAND_CONNECTIONS)
 
-        # downscale the entire frame to fit your little preview box
-        small = cv2.resize(frame, (288, 162), interpolation=cv2.INTER_AREA)
+            # downscale the entire frame to fit your little preview box
+            small = cv2.resize(frame, (288, 162), interpolation=cv2.INTER_AREA)
 
-        # now convert to PhotoImage
-        disp = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
-        img = Image.fromarray(disp)
+            # now convert to PhotoImage
+            disp = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+            img = Image.fromarray(disp)
 
-        imgtk = ImageTk.PhotoImage(image=img)
-        self.video_label.imgtk = imgtk
-        self.video_label.configure(image=imgtk)
+            imgtk = ImageTk.PhotoImage(image=img)
+            self.video_label.imgtk = imgtk
+            self.video_label.configure(image=imgtk)
 
         # schedule next frame
         self.master.after(10, self._update_frame)
 
-    def _handle_hand(self, landmarks: Any, frame_shape: tuple[int, int, int]) -> None:
-        self._mpdraw.draw_landmarks(self.frame, landmarks, self._mphands.HAND_CONNECTIONS)
+    def _handle_hands(self, landmarks: list, handedness: list, frame_shape: tuple[int, int, int]) -> None:
         h, w, _ = frame_shape
-        tip = landmarks.landmark[self._mphands.HandLandmark.INDEX_FINGER_TIP]
-        x1, y1 = int(tip.x * w), int(tip.y * h)
-
-        if self.square_drawing_enabled:
-            thumb = landmarks.landmark[self._mphands.HandLandmark.THUMB_TIP]
-            self._update_square_preview(x1, y1, int(thumb.x * w), int(thumb.y * h), w, h)
-        elif self.circle_drawing_enabled:
-            thumb = landmarks.landmark[self._mphands.HandLandmark.THUMB_TIP]
-            self._update_circle_preview(x1, y1, int(thumb.x * w), int(thumb.y * h), w, h)
-        else:
-            self._move_pointer(x1, y1, w, h)
-
-    # ------------------------------ drawing primitives --------------------
-    def _move_pointer(self, x: int, y: int, frame_w: int, frame_h: int) -> None:
-        cx, cy = self.to_canvas(x, y, frame_w=frame_w, frame_h=frame_h)
-
-        if self.pointer_id is None:
-            self.pointer_id = self.canvas.create_oval(cx - 5, cy - 5, cx + 5, cy + 5, fill="red", outline="",
-                                                      tags="pointer")
-        else:
-            self.canvas.coords(self.pointer_id, cx - 5, cy - 5, cx + 5, cy + 5)
-
-        self._broadcast({
-            "type": "cursor",
-            "id": self.client_id,
-            "coords": [cx, cy],
-        })
-
-        self.canvas.tag_raise("pointer")
+        tips = [lm.landmark[self._mphands.HandLandmark.INDEX_FINGER_TIP] for lm in landmarks]
+        labels = [hd.classification[0].label for hd in handedness] or [""] * len(tips)
+        hands, dropped = self._tracker.update([(t.x, t.y, label) for t, label in zip(tips, labels)])
+        for hand in dropped:
+            if hand.pointer_id is not None:
+                self.canvas.delete(hand.pointer_id)
+            self._broadcast({"type": "cursor_gone", "id": self._cursor_id(hand)})
+        if not hands:
+            return
 
-        if self.is_drawer and self.drawing_enabled:
-            draw_func = {
-                BrushType.SOLID: self._draw_solid,
-                BrushType.AIR: self._draw_air,
-                BrushType.TEXTURE: self._draw_texture,
-                BrushType.CALLIGRAPHY: self._draw_calligraphy,
-                BrushType.BLENDING: self._draw_blending,
-                BrushType.SHINING: self._draw_shining,
-                BrushType.ERASER: self._draw_eraser,
-            }[self.brush.kind]
-            draw_func(cx, cy)
-        self.prev_coord = (cx, cy)
-
-    # -- individual brush implementations ---------------------------------
-    def _draw_solid(self, x: int, y: int) -> None:
-        if self.prev_coord:
-            # local draw
-            self.canvas.create_line(*self.prev_coord, x, y,
-                                    width=3,
-                                    fill=self.brush.colour,
-                                    tags="drawing")
-            # broadcast to peers
-            self._broadcast({
-                "type": "line",
-                "coords": [*self.prev_coord, x, y],
-                "colour": self.brush.colour,
-                "width": 3,
-            })
+        if gestures.ENABLED and self.is_drawer and self._game_started:
+            for hand, lm in zip(hands, landmarks):
+                cmd = hand.gesture.update(lm.landmark, w, h)
+                if cmd:
+                    self._on_gesture(cmd)
+
+        if self.square_drawing_enabled or self.circle_drawing_enabled:
+            # one shape at a time, sized by the active hand
+            active = self._tracker.active
+            i = hands.index(active) if active in hands else 0
+            tip = tips[i]
+            thumb = landmarks[i].landmark[self._mphands.HandLandmark.THUMB_TIP]
+            update = self._update_square_preview if self.square_drawing_enabled else self._update_circle_preview
+            update(int(tip.x * w), int(tip.y * h), int(thumb.x * w), int(thumb.y * h), w, h)
+            return
 
-    def _draw_air(self, x: int, y: int) -> None:
-        for _ in range(20):
-            angle = random.uniform(0, 2 * math.pi)
-            radius = random.uniform(0, 10)
-            ox = int(x + math.cos(angle) * radius)
-            oy = int(y + math.sin(angle) * radius)
-            self.canvas.create_oval(ox, oy, ox + 3, oy + 3,
-                                    fill=self.brush.colour,
-                                    tags="drawing")
-            self._broadcast({
-                "type": "air",
-                "coords": [ox, oy, ox + 3, oy + 3],
-                "colour": self.brush.colour,
-            })
+        for hand, tip in zip(hands, tips):
+            self._move_pointer(hand, int(tip.x * w), int(tip.y * h), w, h)
 
-    def _draw_texture(self, x: int, y: int) -> None:
-        self.canvas.create_text(x, y,
-                                text="✶",
-                                fill=self.brush.colour,
-                                font=("Arial", 10),
-                                tags="drawing")
-        self._broadcast({
-            "type": "texture",
-            "coords": [x, y],
-            "colour": self.brush.colour,
-        })
+    def _cursor_id(self, hand: hand_tracking.Hand) -> str:
+        return self.client_id if hand.id == 0 else f"{self.client_id}:{hand.id}"
 
-    def _draw_calligraphy(self, x: int, y: int) -> None:
-        if not self.prev_coord:
-            self.prev_coord = (x, y)
+    def _on_gesture(self, cmd: str) -> None:
+        """A pose's START / STOP / PLACE takes the voice path – when it changes something."""
+        shaping = self.square_drawing_enabled or self.circle_drawing_enabled
+        if cmd == "START" and (self.drawing_enabled or shaping):
+            return   # already drawing; in shape mode thumb + index size the shape
+        if cmd == "STOP" and not (self.drawing_enabled or shaping):
             return
-        width = self._calligraphy_width((x, y))
-        offset = width / 2
-        px, py = self.prev_coord
-        dx, dy = x - px, y - py
-        if math.hypot(dx, dy) < 1:
+        if cmd == "PLACE" and not shaping:
             return
-        angle = math.atan2(dy, dx) + math.pi / 4
-        ox, oy = offset * math.cos(angle), offset * math.sin(angle)
-        poly = (
-            px - ox, py - oy,
-            px + ox, py + oy,
-            x + ox, y + oy,
-            x - ox, y - oy,
-        )
-        self.canvas.create_polygon(*poly,
-                                   fill=self.brush.colour,
-                                   outline=self.brush.colour,
-                                   tags="drawing")
-        self._broadcast({
-            "type": "calligraphy",
-            "polygon": poly,
-            "colour": self.brush.colour,
-        })
-        self.prev_coord = (x, y)
-
-    def _calligraphy_width(self, curr: tuple[int, int]) -> float:
-        now = time.time()
-        if self.last_time is None or self.prev_coord is None:
-            self.last_time = now
-            return self.max_calligraphy_width
-        dt = now - self.last_time or 1e-5
-        dist = math.hypot(curr[0] - self.prev_coord[0], curr[1] - self.prev_coord[1])
-        speed = dist / dt
-        self.last_time = now
-        return max(self.min_calligraphy_width, self.max_calligraphy_width - speed * self.width_scaling)
+        print(f"Gesture: {cmd}")
+        self._handle_command(cmd)
 
-    # ---------------------------------------------------------------------
+    # ------------------------------ drawing primitives --------------------
+    def _move_pointer(self, hand: hand_tracking.Hand, x: int, y: int, frame_w: int, frame_h: int) -> None:
+        cx, cy = self.to_canvas(x, y, frame_w=frame_w, frame_h=frame_h)
 
-    def _draw_blending(self, x: int, y: int) -> None:
-        for _ in range(10):
-            ox = x + random.randint(-3, 3)
-            oy = y + random.randint(-3, 3)
-            self.canvas.create_oval(ox - 5, oy - 5, ox + 5, oy + 5,
-                                    fill=self.brush.colour,
-                                    outline="",
-                                    stipple="gray50",
-                                    tags="drawing")
-            self._broadcast({
-                "type": "blending",
-                "coords": [ox, oy],
-                "colour": self.brush.colour,
-            })
+        if hand.pointer_id is None:
+            colour = _POINTER_COLOURS[hand.id % len(_POINTER_COLOURS)]
+            hand.pointer_id = self.canvas.create_oval(cx - 5, cy - 5, cx + 5, cy + 5, fill=colour, outline="",
+                                                      tags="pointer")
+        else:
+            self.canvas.coords(hand.pointer_id, cx - 5, cy - 5, cx + 5, cy + 5)
+
+        # peers interpolate between samples, so a modest rate is enough
+        now = time.monotonic()
+        if now - hand.last_cursor_sent >= 1 / CURSOR_SEND_HZ:
+            hand.last_cursor_sent = now
+            self._broadcast(self._to_units({
+                "type": "cursor",
+                "id": self._cursor_id(hand),
+                "coords": [cx, cy],
+            }))
 
-    def _draw_shining(self, x: int, y: int) -> None:
-        for i in range(8):
-            ang = (2 * math.pi / 8) * i
-            ex = x + 10 * math.cos(ang)
-            ey = y + 10 * math.sin(ang)
-            self.canvas.create_line(x, y, ex, ey,
-                                    fill=self.brush.colour,
-                                    tags="drawing")
-        self.canvas.create_oval(x - 2, y - 2, x + 2, y + 2,
-                                fill=self.brush.colour,
-                                outline="",
-                                tags="drawing")
-        self._broadcast({
-            "type": "shining",
-            "center": [x, y],
-            "colour": self.brush.colour,
-        })
+        self.canvas.tag_raise("pointer")
 
-    def _draw_eraser(self, x: int, y: int) -> None:
-        if self.prev_coord:
-            bg = self.canvas["bg"]
-            self.canvas.create_line(*self.prev_coord, x, y,
-                                    width=self.eraser_width,
-                                    fill=bg,
-                                    tags="drawing")
-            self._broadcast({
-                "type": "eraser",
-                "coords": [*self.prev_coord, x, y],
-                "width": self.eraser_width,
-            })
+        if self.is_drawer and self.drawing_enabled:
+            self._paint(cx, cy, hand.brush, hand.stroke)
+            self._tracker.drew(hand)
+        hand.stroke.prev = (cx, cy)
+
+    def _paint(
+        self, x: float, y: float, brush: Brush | None = None, stroke: brushes.Stroke | None = None
+    ) -> None:
+        """Draw with *brush* (default: the active one, see brushes.py) and send the same events to peers."""
+        brush = brush or self.brush
+        stroke = stroke or self.stroke
+        style = brushes.BRUSHES[brush.kind]
+        with self._prof.span("brush"):
+            for ev in style.events(stroke, x, y, brush.colour):
+                style.render(self.canvas, ev)
+                ev = self._to_units(ev)
+                self._drawn.append(ev)
+                self._broadcast(ev)
 
         # --------------------------- shape previews ---------------------------
 
@@ -645,21 +630,23 @@ class GestureDrawingApp(DrawingApp):
                 tags="drawing"
             )
 
-        self._broadcast({
+        self._broadcast(self._to_units({
             "type":   "square_preview",
             "corners": corners,
             "colour": color,
-        })
+        }))
 
     def _finalize_square(self) -> None:
         if getattr(self, "square_preview", None) is not None:
             corners = self.canvas.coords(self.square_preview)
             final_color = self.brush.colour
-            self._broadcast({
+            ev = self._to_units({
                 "type": "square_finalize",
                 "corners": corners,
                 "colour": final_color,
             })
+            self._drawn.append(ev)
+            self._broadcast(ev)
 
             self.canvas.itemconfig(
                 self.square_preview,
@@ -692,21 +679,23 @@ class GestureDrawingApp(DrawingApp):
                 tags="drawing"
             )
 
-        self._broadcast({
+        self._broadcast(self._to_units({
             "type": "circle_preview",
             "bbox": bbox,
             "colour": color,
-        })
+        }))
 
     def _finalize_circle(self) -> None:
         if getattr(self, "circle_preview", None) is not None:
             bbox = self.canvas.coords(self.circle_preview)
             final_color = self.brush.colour
-            self._broadcast({
+            ev = self._to_units({
                 "type": "circle_finalize",
                 "bbox": bbox,
-                 "colour": final_color,
+                "colour": final_color,
             })
+            self._drawn.append(ev)
+            self._broadcast(ev)
 
             self.canvas.itemconfig(
                 self.circle_preview,
@@ -719,32 +708,85 @@ class GestureDrawingApp(DrawingApp):
 
     # --------------------------- cleanup ----------------------------------
     def __del__(self) -> None:
-        if self.cap.isOpened():
-            self.cap.release()
-        cv2.destroyAllWindows()
+        cap = getattr(self, "cap", None)
+        if cap is not None and cap.isOpened():
+            cap.release()
+        if cv2 is not None:
+            cv2.destroyAllWindows()
 
     # --------------------------- network polling ---------------------------
     def _poll_network(self):
-        for ev in network.get_events():
-            self._apply_event(ev)
-        self.master.after(20, self._poll_network)
+        with self._prof.span("network"):
+            now = time.monotonic()
+            for sender, ev in network.get_events():
+                t = ev.get("type")
+                if t == "cursor":
+                    self._rec.record(recording.IN, ev)
+                    # drawn by _render_remote, interpolated between samples
+                    x, y = ev["coords"]
+                    track = self._cursor_tracks.get(ev["id"])
+                    if track is None:
+                        track = self._cursor_tracks[ev["id"]] = CursorTrack(self._playout_delay)
+                    track.push(ev.get("ts", time.time()), x, y, now)
+                elif t == "line" and "ts" in ev:
+                    buffer = self._line_buffers.get(sender)
+                    if buffer is None:
+                        buffer = self._line_buffers[sender] = JitterBuffer(self._playout_delay)
+                    buffer.push(ev["ts"], ev, now)
+                else:
+                    self._pending_events.append((sender, ev))
+
+            # apply in arrival order until this tick's budget is spent
+            deadline = time.perf_counter() + _NET_BUDGET_S
+            pending = self._pending_events
+            while pending and time.perf_counter() < deadline:
+                sender, ev = pending.popleft()
+                # that sender's buffered strokes were sent before this event –
+                # keep its order; other senders' strokes keep their delay
+                buffer = self._line_buffers.get(sender)
+                if buffer:
+                    for line in buffer.drain():
+                        self._apply_event(line)
+                self._apply_event(ev)
+
+        # backlog left → yield to Tk briefly, then carry on
+        self.master.after(1 if pending else 20, self._poll_network)
+
+    def _render_remote(self) -> None:
+        """~60 Hz playout of jitter-buffered strokes and interpolated cursors."""
+        now = time.monotonic()
+        for sender, buffer in list(self._line_buffers.items()):
+            for ev in buffer.pop_due(now):
+                self._apply_event(ev)
+            if not buffer and now - buffer.last_seen > _QUIET_S:
+                del self._line_buffers[sender]
+        for peer_id, track in list(self._cursor_tracks.items()):
+            if now - track.last_seen > _QUIET_S:
+                self._remove_remote_cursor(peer_id)
+                continue
+            pos = track.position(now)
+            if pos is not None:
+                self._place_remote_cursor(peer_id, *pos)
+        self.master.after(16, self._render_remote)
 
     def _apply_event(self, ev: dict):
         """Draw whatever your peer just sent."""
         t = ev.get("type")
+        if t in ("state_snapshot", "snapshot_chunk"):
+            # the history is recorded event by event as it gets applied
+            self._rec.record(recording.IN, {k: v for k, v in ev.items() if k not in ("history", "strokes")})
+        else:
+            self._rec.record(recording.IN, ev)
+
+        # strokes are the bulk of live traffic and of every replay
+        render = brushes.RENDERERS.get(t)
+        if render is not None:
+            self._drawn.append(ev)
+            render(self.canvas, scaled(ev, self.canvas_w, self.canvas_h))
+            return
 
         if t == "hello" and self.is_drawer:
-            network.send_direct(
-                ev["id"],
-                {
-                    "type":   "state_snapshot",
-                    "drawer": self.current_drawer,
-                    "prompt": self.current_prompt,
-                    "history": self.event_history,
-                    "game_started": self._game_started,
-                    "round_active": self.round_active,
-                }
-            )
+            self._send_snapshot(ev["id"])
             return
         
         if t == "state_snapshot":
@@ -753,9 +795,10 @@ class GestureDrawingApp(DrawingApp):
             self.current_drawer = ev["drawer"]
             self.is_drawer = (self.current_drawer == self.client_id)
             self.current_prompt = ev["prompt"]
-            self.canvas.delete("drawing")
-            for old_ev in ev["history"]:
-                self._apply_event(old_ev)          # reuse existing logic
+            self._clear_drawing()
+            # replay ahead of anything that arrived after the snapshot,
+            # spread over the next few _poll_network ticks
+            self._pending_events.extendleft((None, e) for e in reversed(snapshot_events(ev)))
             if self.is_drawer:
                 self.prompt_visible = True
                 self._refresh_instruction("Say 'START' to begin drawing.")
@@ -765,14 +808,20 @@ class GestureDrawingApp(DrawingApp):
                 self._refresh_instruction(
                     "Opponent is drawing — say 'MY GUESS IS …' to guess!"
                 )
+            self._record_state()
+            return
+
+        if t == "snapshot_chunk":
+            self._pending_events.extendleft((None, e) for e in reversed(snapshot_events(ev)))
             return
 
         if t == "start_round":
+            self._prompts.note(ev["prompt"])   # our own picks are noted by pick()
             self._start_new_round(ev["drawer_id"], ev["prompt"])
             return
 
         if t == "guess" and self.is_drawer:
-            if ev["guess"].lower() == self.current_prompt.lower():
+            if self._words.is_match(ev["guess"], self.current_prompt):
                 self._broadcast({
                     "type": "correct_guess",
                     "winner_id": ev["id"],
@@ -802,71 +851,17 @@ class GestureDrawingApp(DrawingApp):
         if t == "correct_guess":
             winner_id = ev["winner_id"]
             is_you = (winner_id == self.client_id)
-            self.canvas.delete("drawing")
+            self._clear_drawing()
             winner_label = "You" if is_you else f"Peer {winner_id}"
             msg = f"{winner_label} guessed right!\nIt was '{ev['prompt']}'"
             self._show_overlay_message(msg)
+            self._record_state()
             return
 
 
-        if t == "line":
-            x1, y1, x2, y2 = ev["coords"]
-            self.canvas.create_line(x1, y1, x2, y2,
-                                    fill=ev.get("colour", "black"),
-                                    width=ev.get("width", 2),
-                                    tags="drawing")
-        # extend handling for other types as needed
-        elif t == "air":
-            x1, y1, x2, y2 = ev["coords"]
-            self.canvas.create_oval(x1, y1, x2, y2,
-                                    fill=ev["colour"],
-                                    tags="drawing")
-
-        elif t == "texture":
-            x, y = ev["coords"]
-            self.canvas.create_text(x, y, text="✶",
-                                    fill=ev["colour"],
-                                    font=("Arial", 10),
-                                    tags="drawing")
-
-        elif t == "calligraphy":
-            poly = ev["polygon"]
-            self.canvas.create_polygon(*poly,
-                                       fill=ev["colour"],
-                                       outline=ev["colour"],
-                                       tags="drawing")
-
-        elif t == "blending":
-            x, y = ev["coords"]
-            self.canvas.create_oval(x - 5, y - 5, x + 5, y + 5,
-                                    fill=ev["colour"],
-                                    stipple="gray50",
-                                    tags="drawing")
-
-        elif t == "shining":
-            x, y = ev["center"]
-            for i in range(8):
-                ang = (2 * math.pi / 8) * i
-                ex = x + 10 * math.cos(ang)
-                ey = y + 10 * math.sin(ang)
-                self.canvas.create_line(x, y, ex, ey,
-                                        fill=ev["colour"],
-                                        tags="drawing")
-            self.canvas.create_oval(x - 2, y - 2, x + 2, y + 2,
-                                    fill=ev["colour"],
-                                    tags="drawing")
-
-        elif t == "eraser":
-            x1, y1, x2, y2 = ev["coords"]
-            bg = self.canvas["bg"]
-            self.canvas.create_line(x1, y1, x2, y2,
-                                    width=ev["width"],
-                                    fill=bg,
-                                    tags="drawing")
-
-        elif t == "square_preview":
+        if t == "square_preview":
             c = ev.get("colour", "red")
-            corners = ev["corners"]
+            corners = self._to_pixels(ev)["corners"]
             if hasattr(self, "remote_sqprev"):
                 self.canvas.coords(self.remote_sqprev, *corners)
             else:
@@ -877,20 +872,15 @@ class GestureDrawingApp(DrawingApp):
                                                                 tags="drawing")
 
         elif t == "square_finalize":
-            c = ev.get("colour", "black")
-            corners = ev["corners"]
             # remove preview if you like:
             if hasattr(self, "remote_sqprev"):
                 self.canvas.delete(self.remote_sqprev)
-            self.canvas.create_polygon(*corners,
-                                       outline=c,
-                                       fill="",
-                                       width=5,
-                                       tags="drawing")
+            self._drawn.append(ev)
+            self._draw(ev)
 
         elif t == "circle_preview":
             c = ev.get("colour", "red")
-            bbox = ev["bbox"]
+            bbox = self._to_pixels(ev)["bbox"]
             if hasattr(self, "remote_circprev"):
                 self.canvas.coords(self.remote_circprev, *bbox)
             else:
@@ -900,33 +890,101 @@ class GestureDrawingApp(DrawingApp):
                                                                width=5,
                                                                tags="drawing")
         elif t == "circle_finalize":
-            c = ev.get("colour", "black")
-            bbox = ev["bbox"]
             # remove preview if you like:
             if hasattr(self, "remote_circprev"):
                 self.canvas.delete(self.remote_circprev)
-            self.canvas.create_oval(*bbox,
-                                    outline=c,
-                                    fill="",
-                                    width=5,
-                                    tags="drawing")
+            self._drawn.append(ev)
+            self._draw(ev)
 
         # handle cursor events
         if t == "cursor":
-            peer_id = ev["id"]
-            x, y = ev["coords"]
-            # if we already have an oval for that peer, move it
-            if peer_id in self.remote_cursors:
-                self.canvas.coords(self.remote_cursors[peer_id],
-                                   x - 5, y - 5, x + 5, y + 5
-                                   )
-            else:
-                # create a new small circle in a different color
-                oid = self.canvas.create_oval(
-                    x - 5, y - 5, x + 5, y + 5,
-                    fill="blue", outline="", tags="cursor"
-                )
-                self.remote_cursors[peer_id] = oid
+            self._place_remote_cursor(ev["id"], *ev["coords"])
+        elif t == "cursor_gone":   # a tracked hand left the sender's camera
+            self._remove_remote_cursor(ev["id"])
+
+    def _place_remote_cursor(self, peer_id: str, x: float, y: float) -> None:
+        x, y = x * self.canvas_w, y * self.canvas_h
+        # if we already have an oval for that peer, move it
+        if peer_id in self.remote_cursors:
+            self.canvas.coords(self.remote_cursors[peer_id],
+                               x - 5, y - 5, x + 5, y + 5
+                               )
+        else:
+            # create a new small circle in a different color
+            oid = self.canvas.create_oval(
+                x - 5, y - 5, x + 5, y + 5,
+                fill="blue", outline="", tags="cursor"
+            )
+            self.remote_cursors[peer_id] = oid
+
+    # --------------------------- canvas units ------------------------------
+    # Events carry coordinates as fractions of the canvas (stroke_store.scaled),
+    # so every window size draws the same picture.
+    def _to_units(self, ev: dict) -> dict:
+        return scaled(ev, 1 / self.canvas_w, 1 / self.canvas_h, UNIT_DIGITS)
+
+    def _to_pixels(self, ev: dict) -> dict:
+        return scaled(ev, self.canvas_w, self.canvas_h)
+
+    def _draw(self, ev: dict) -> None:
+        """Render a stroke or finished shape (in canvas units) at the current size."""
+        t = ev["type"]
+        px = self._to_pixels(ev)
+        render = brushes.RENDERERS.get(t)
+        if render is not None:
+            render(self.canvas, px)
+        elif t == "square_finalize":
+            self.canvas.create_polygon(*px["corners"], outline=ev.get("colour", "black"), fill="", width=5,
+                                       tags="drawing")
+        elif t == "circle_finalize":
+            self.canvas.create_oval(*px["bbox"], outline=ev.get("colour", "black"), fill="", width=5,
+                                    tags="drawing")
+
+    def _clear_drawing(self) -> None:
+        self.canvas.delete("drawing")
+        self._drawn.clear()
+
+    def on_resize(self) -> None:
+        """Redraw everything at the new size; previews and cursors follow with the next move."""
+        self.canvas.delete("drawing")
+        self.square_preview = self.circle_preview = None
+        self.__dict__.pop("remote_sqprev", None)
+        self.__dict__.pop("remote_circprev", None)
+        for ev in self._drawn:
+            self._draw(ev)
+
+    def _remove_remote_cursor(self, peer_id: str) -> None:
+        self._cursor_tracks.pop(peer_id, None)
+        oid = self.remote_cursors.pop(peer_id, None)
+        if oid is not None:
+            self.canvas.delete(oid)
+
+    def _send_snapshot(self, peer_id: str) -> None:
+        """Send game state + history to a newcomer, split into small messages.
+
+        The first chunk rides along with the state; the rest follow as
+        ``snapshot_chunk`` messages so a long game never becomes one huge frame.
+        """
+        history = self.event_history
+        n = SNAPSHOT_CHUNK_EVENTS
+        network.send_direct(
+            peer_id,
+            {
+                "type":   "state_snapshot",
+                "drawer": self.current_drawer,
+                "prompt": self.current_prompt,
+                "strokes": history.pack(0, n),
+                "chunks": max(1, math.ceil(len(history) / n)),
+                "game_started": self._game_started,
+                "round_active": self.round_active,
+            }
+        )
+        for seq, start in enumerate(range(n, len(history), n), start=1):
+            network.send_direct(peer_id, {
+                "type": "snapshot_chunk",
+                "seq": seq,
+                "strokes": history.pack(start, start + n),
+            })
 
     def _start_new_round(self, drawer: str, prompt: str):
         self.current_drawer = drawer
@@ -940,20 +998,31 @@ class GestureDrawingApp(DrawingApp):
         self.square_drawing_enabled = False
         self.circle_drawing_enabled = False
 
-        self.canvas.delete("drawing")
+        self._clear_drawing()
         if self.is_drawer:
             self._refresh_instruction(self._instruction_banner("Say 'START' to begin drawing."))
             self.prompt_visible = True        # show the word first
             self._queue_prompt_hide()
         else:
-            if USE_LLM:
+            if voice.USE_LLM:
                 self._refresh_instruction("Opponent is drawing — say your guess!")
             else:
                 self._refresh_instruction("Opponent is drawing — say 'MY GUESS IS …' to guess!")
+        self._record_state()
+
+    def _record_state(self) -> None:
+        self._rec.record(recording.STATE, {
+            "type": "game_state",
+            "drawer": self.current_drawer,
+            "prompt": self.current_prompt,
+            "is_drawer": self.is_drawer,
+            "round_active": self.round_active,
+            "game_started": self._game_started,
+        })
 
     def _local_start_round(self, drawer_id: str = None):
         # pick a word
-        word = random.choice(_PROMPTS)
+        word = self._prompts.pick()
         drawer = drawer_id or self.client_id
 
         # update UI + state locally
@@ -969,8 +1038,11 @@ class GestureDrawingApp(DrawingApp):
 
     def _broadcast(self, data: dict) -> None:
         """Send an event to peers and keep it in history (except transient ones)."""
-        if data["type"] not in ("cursor",):           # cursors don’t matter for replay
+        if data["type"] in ("cursor", "line"):        # lets peers smooth playout
+            data["ts"] = time.time()
+        if data["type"] not in ("cursor", "cursor_gone"):   # cursors don’t matter for replay
             self.event_history.append(data)
+        self._rec.record(recording.OUT, data)
         network.broadcast_event(data)
 
     def _show_overlay_message(self, text: str, duration_ms: int = 5000) -> None:
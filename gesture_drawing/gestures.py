@@ -0,0 +1,86 @@
+# gestures.py
+
+"""Hand-pose commands, recognised from the landmarks every frame.
+
+    thumb + index pinch    START   (begin drawing)
+    flat palm, thumb in    STOP
+    thumb + middle pinch   PLACE   (finalise a square / circle)
+
+Pinches are measured as fingertip distance over palm size (wrist → middle
+knuckle), so they work at any distance from the camera.  A pinch engages
+below ``PINCH_ON`` and holds until ``PINCH_OFF`` (hysteresis), and a pose
+has to last ``HOLD_FRAMES`` frames before it counts (debounce); each pose
+fires its command once, when it is entered.  That is frame latency –
+tens of milliseconds – instead of speech latency.
+
+The palm needs the thumb held against the hand: sizing a square or circle
+spreads thumb and index with the other fingers out, which would otherwise
+read as a palm and stop shape mode.
+"""
+from __future__ import annotations
+
+import math
+from typing import Sequence
+
+ENABLED = True   # set this in your main.py (--no-gestures)
+
+# MediaPipe hand landmark indices
+WRIST = 0
+THUMB_TIP = 4
+INDEX_MCP, INDEX_PIP, INDEX_TIP = 5, 6, 8
+MIDDLE_MCP, MIDDLE_PIP, MIDDLE_TIP = 9, 10, 12
+RING_PIP, RING_TIP = 14, 16
+PINKY_PIP, PINKY_TIP = 18, 20
+
+PINCH_ON = 0.30     # × palm size
+PINCH_OFF = 0.45
+EXTENDED = 1.15     # tip this much farther from the wrist than its middle joint
+THUMB_TUCKED = 0.6  # × palm size, thumb tip to index knuckle
+HOLD_FRAMES = {"pinch": 2, "middle_pinch": 3, "palm": 4, None: 3}
+
+COMMANDS = {"pinch": "START", "palm": "STOP", "middle_pinch": "PLACE"}
+
+_FINGERS = ((INDEX_PIP, INDEX_TIP), (MIDDLE_PIP, MIDDLE_TIP),
+            (RING_PIP, RING_TIP), (PINKY_PIP, PINKY_TIP))
+
+
+class GestureRecogniser:
+    """One per hand: landmark frames in, a command out when a pose begins."""
+
+    __slots__ = ("pose", "_candidate", "_count")
+
+    def __init__(self) -> None:
+        self.pose: str | None = None        # the pose currently held
+        self._candidate: str | None = None
+        self._count = 0
+
+    def classify(self, lm: Sequence, w: int, h: int) -> str | None:
+        """Pose in this frame – pinch thresholds depend on the current pose."""
+        def dist(a: int, b: int) -> float:
+            return math.hypot((lm[a].x - lm[b].x) * w, (lm[a].y - lm[b].y) * h)
+
+        palm = dist(WRIST, MIDDLE_MCP) or 1.0
+        index = dist(THUMB_TIP, INDEX_TIP) / palm
+        middle = dist(THUMB_TIP, MIDDLE_TIP) / palm
+        pinch = min((index, "pinch"), (middle, "middle_pinch"))
+        limit = PINCH_OFF if self.pose == pinch[1] else PINCH_ON
+        if pinch[0] < limit:
+            return pinch[1]
+        if (all(dist(WRIST, tip) > EXTENDED * dist(WRIST, pip) for pip, tip in _FINGERS)
+                and dist(THUMB_TIP, INDEX_MCP) / palm < THUMB_TUCKED):
+            return "palm"
+        return None
+
+    def update(self, lm: Sequence, w: int, h: int) -> str | None:
+        """Feed one frame; returns START / STOP / PLACE when a pose has just begun."""
+        pose = self.classify(lm, w, h)
+        if pose == self.pose:
+            self._candidate = None
+            return None
+        if pose != self._candidate:
+            self._candidate, self._count = pose, 0
+        self._count += 1
+        if self._count < HOLD_FRAMES[pose]:
+            return None
+        self.pose, self._candidate = pose, None
+        return COMMANDS.get(pose)
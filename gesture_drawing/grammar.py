@@ -0,0 +1,219 @@
+# grammar.py
+
+"""Offline matcher for the voice-command grammar.
+
+Resolves a transcript to one of the commands ``GestureDrawingApp`` understands
+using exact lookup first, then fuzzy (``difflib``) and phonetic (Soundex)
+similarity.  Only when the best match is below ``THRESHOLD`` does the caller
+need to ask the LLM (see ``voice.listen_for_commands``).
+"""
+from __future__ import annotations
+
+import difflib
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+THRESHOLD = 0.8   # accept a local match at or above this confidence
+# a one-word utterance that only *sounds* like a command ("sure" ~ square,
+# "one" ~ place) is usually just speech: keep it below THRESHOLD and below
+# voice.FALLBACK_CONFIDENCE, so only the LLM can turn it into a command
+SINGLE_WORD_FUZZY_MAX = 0.55
+
+# safe to act on from a partial transcript: saying more can't change them
+INSTANT = frozenset({"START", "STOP", "PLACE"})
+
+MODES = ("draw", "place", "guess", "brush")
+
+BRUSHES = ("solid", "air", "texture", "calligraphy", "blending", "shining", "eraser")
+
+COLOURS = (
+    "black", "white", "red", "green", "blue", "yellow", "orange", "purple",
+    "pink", "brown", "grey", "gray", "cyan", "magenta", "violet", "gold",
+    "silver", "navy", "maroon", "olive", "teal", "turquoise", "beige",
+    "lime", "indigo", "coral", "salmon", "khaki", "lavender", "crimson",
+)
+
+# fixed phrases: command → spoken variants
+_FIXED: dict[str, dict[str, tuple[str, ...]]] = {
+    "draw": {
+        "START": ("start", "start drawing", "begin", "go"),
+        "STOP": ("stop", "stop drawing", "halt", "pause"),
+        "SQUARE": ("square", "draw a square"),
+        "CIRCLE": ("circle", "draw a circle"),
+        "ERASER": ("eraser", "erase", "rubber"),
+        "BRUSH": ("brush", "change brush", "change the brush", "new brush"),
+    },
+    "place": {
+        "PLACE": ("place", "play", "place it", "put it there", "right there", "there",
+                  "done", "square", "circle"),
+        "STOP": ("stop",),
+    },
+    "guess": {},
+    "brush": {b: (b,) for b in BRUSHES[:-1]} | {"air": ("air", "are", "hair")},
+}
+
+# prefix + slot patterns: (spoken prefix, command template, slot vocabulary)
+_PATTERNS: dict[str, tuple[tuple[str, str, tuple[str, ...] | None], ...]] = {
+    "draw": (
+        ("change color to", "CHANGE COLOR TO {}", COLOURS),
+        ("change colour to", "CHANGE COLOR TO {}", COLOURS),
+        ("change the color to", "CHANGE COLOR TO {}", COLOURS),
+        ("change brush to", "CHANGE BRUSH TO {}", BRUSHES),
+        ("change the brush to", "CHANGE BRUSH TO {}", BRUSHES),
+    ),
+    "place": (),
+    "guess": (
+        ("my guess is", "MY GUESS IS {}", None),
+        ("i guess", "MY GUESS IS {}", None),
+        ("is it", "MY GUESS IS {}", None),
+        ("it is", "MY GUESS IS {}", None),
+    ),
+    "brush": (),
+}
+_PATTERNS["draw"] += _PATTERNS["guess"][:1]   # exact phrase still works everywhere
+
+# while sizing a shape the normal drawing commands still apply
+_FALLBACK = {"place": "draw"}
+
+_WORD = re.compile(r"[a-z0-9#']+")
+_HEX = re.compile(r"#?[0-9a-f]{6}")
+
+
+class Match(NamedTuple):
+    command: str
+    confidence: float
+
+
+def normalise_text(text: str) -> str:
+    """Lower-case, drop punctuation, collapse whitespace."""
+    return " ".join(_WORD.findall(text.lower()))
+
+
+_SOUNDEX = str.maketrans("bfpvcgjkqsxzdtlmnr", "111122222222334556")
+
+
+def soundex(word: str) -> str:
+    """Classic 4-character Soundex code ("" for non-alphabetic input)."""
+    word = "".join(c for c in word.lower() if c.isalpha())
+    if not word:
+        return ""
+    codes = word.translate(_SOUNDEX)
+    out, prev = [word[0].upper()], codes[0]
+    for ch, code in zip(word[1:], codes[1:]):
+        if code.isdigit() and code != prev:
+            out.append(code)
+        if ch not in "hw":
+            prev = code
+    return "".join(out).ljust(4, "0")[:4]
+
+
+@lru_cache(maxsize=4096)
+def phonetic_key(text: str) -> str:
+    return " ".join(soundex(w) for w in text.split())
+
+
+@lru_cache(maxsize=8192)
+def similarity(a: str, b: str) -> float:
+    """Best of spelling and (slightly discounted) sound similarity, 0‥1."""
+    if a == b:
+        return 1.0
+    sm = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    if sm.real_quick_ratio() < 0.5:   # lengths alone rule out a match
+        return 0.0
+    spelt = sm.ratio()
+    if spelt >= 0.95:
+        return spelt
+    sound = difflib.SequenceMatcher(None, phonetic_key(a), phonetic_key(b), autojunk=False).ratio()
+    return max(spelt, 0.9 * sound)
+
+
+# exact lookup tables, built once
+_EXACT: dict[str, dict[str, str]] = {
+    mode: {alias: cmd for cmd, aliases in table.items() for alias in aliases}
+    for mode, table in _FIXED.items()
+}
+
+
+def _best(word: str, vocab: tuple[str, ...]) -> tuple[str, float]:
+    best, score = word, 0.0
+    for cand in vocab:
+        s = similarity(word, cand)
+        if s > score:
+            best, score = cand, s
+    return best, score
+
+
+def _match_slot(slot: str, vocab: tuple[str, ...] | None) -> tuple[str, float]:
+    if vocab is None:                                  # free text (guesses)
+        return slot, 1.0 if slot else 0.0
+    if vocab is COLOURS and _HEX.fullmatch(slot):
+        return slot if slot.startswith("#") else f"#{slot}", 1.0
+    word, score = _best(slot, vocab)
+    # unknown colour names may still be valid Tk colours – pass them through
+    if score < THRESHOLD and vocab is COLOURS and slot:
+        return slot, THRESHOLD
+    return word, score
+
+
+@lru_cache(maxsize=1024)
+def match(transcript: str, mode: str = "draw") -> Match | None:
+    """Best grammar match for *transcript* in *mode*, or ``None``."""
+    text = normalise_text(transcript)
+    if not text:
+        return None
+
+    exact = _EXACT[mode].get(text)
+    if exact is not None:
+        return Match(exact, 1.0)
+
+    tokens = text.split()
+    best: Match | None = None
+
+    for prefix, template, vocab in _PATTERNS[mode]:
+        n = len(prefix.split())
+        if len(tokens) <= n:
+            continue
+        head = " ".join(tokens[:n])
+        p_score = 1.0 if head == prefix else similarity(head, prefix)
+        if p_score < 0.6:
+            continue
+        slot, s_score = _match_slot(" ".join(tokens[n:]), vocab)
+        conf = p_score * s_score
+        if best is None or conf > best.confidence:
+            best = Match(template.format(slot).upper(), conf)
+        if conf == 1.0:
+            return best
+
+    # (not in the brush popup, which has just asked for one word)
+    fuzzy_max = SINGLE_WORD_FUZZY_MAX if len(tokens) == 1 and mode != "brush" else 1.0
+    for alias, cmd in _EXACT[mode].items():
+        s = min(similarity(text, alias), fuzzy_max)
+        if best is None or s > best.confidence:
+            best = Match(cmd, s)
+
+    if mode == "draw" and len(tokens) <= 2:
+        # a bare brush name ("calligraphy") means "change brush to …"; sound-alikes
+        # of "air" ("are", "hair") only count in the brush popup's exact aliases
+        word, s = _best(text, BRUSHES)
+        if s < 1.0:
+            s = min(s, fuzzy_max)
+        if best is None or s > best.confidence:
+            best = Match(f"CHANGE BRUSH TO {word.upper()}", s)
+
+    if mode == "guess" and (best is None or best.confidence < THRESHOLD):
+        # in guess mode a lone prompt word is almost always the guess itself;
+        # any other lone word ("okay", "hello") is stray speech until the LLM says so
+        if len(tokens) == 1:
+            from .words import get_index   # words imports this module
+
+            known = get_index().lookup(tokens[0]) is not None
+            return Match(f"MY GUESS IS {tokens[0].upper()}", THRESHOLD if known else 0.5)
+        return Match(f"MY GUESS IS {tokens[-1].upper()}", 0.5)
+
+    if mode in _FALLBACK and (best is None or best.confidence < THRESHOLD):
+        other = match(transcript, _FALLBACK[mode])
+        if other is not None and (best is None or other.confidence > best.confidence):
+            return other
+
+    return best
@@ -0,0 +1,125 @@
+# hand_tracking.py
+
+"""Per-hand state, so several people can draw at one webcam.
+
+MediaPipe returns every hand in a frame from the one ``Hands.process``
+call, but in no stable order.  :class:`HandTracker` gives each hand a small
+id that follows it from frame to frame – nearest index fingertip to where
+a hand was last seen, same handedness preferred – so each keeps its own
+pointer, brush and stroke.  A hand missing for up to ``LOST_FRAMES``
+frames (a missed detection) keeps its state.  A fingertip that matches no
+hand starts a new one only while fewer than ``MAX_HANDS`` are tracked;
+otherwise it takes over the nearest hand that is missing (it moved further
+than ``MAX_JUMP``), so ids stay below ``MAX_HANDS`` and so do the remote
+cursors.  The app tells peers about dropped hands (``cursor_gone``).
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+from .brushes import Stroke
+from .gestures import GestureRecogniser
+
+MAX_HANDS = 2       # set this in your main.py (--hands)
+LOST_FRAMES = 5
+MAX_JUMP = 0.25     # furthest a fingertip moves between frames (normalised)
+_OTHER_HAND = 0.1   # distance penalty for a handedness mismatch
+
+
+@dataclass(slots=True)
+class Hand:
+    id: int
+    brush: Any                      # gesture_app.Brush
+    label: str = ""                 # MediaPipe handedness
+    x: float = 0.0                  # last index fingertip, normalised
+    y: float = 0.0
+    stroke: Stroke = field(default_factory=Stroke)
+    pointer_id: int | None = None   # canvas item
+    last_cursor_sent: float = 0.0
+    missed: int = 0
+    gesture: GestureRecogniser = field(default_factory=GestureRecogniser)
+
+
+class HandTracker:
+    def __init__(self, brush: Any) -> None:
+        self.hands: dict[int, Hand] = {}
+        self.default_brush = brush   # before any hand is seen (and for the mouse)
+        self._last_drawn: Hand | None = None
+
+    @property
+    def active(self) -> Hand | None:
+        """The hand that drew last, else the one tracked longest."""
+        hand = self._last_drawn
+        if hand is not None and self.hands.get(hand.id) is hand:
+            return hand
+        return self.hands[min(self.hands)] if self.hands else None
+
+    @property
+    def brush(self) -> Any:
+        """The brush voice commands change: the active hand's."""
+        hand = self.active
+        return hand.brush if hand is not None else self.default_brush
+
+    def drew(self, hand: Hand) -> None:
+        self._last_drawn = hand
+
+    def update(self, tips: list[tuple[float, float, str]]) -> tuple[list[Hand], list[Hand]]:
+        """Match this frame's fingertips ``(x, y, handedness)`` to hands.
+
+        Returns the hand for each fingertip, in order, and the hands that
+        were dropped.
+        """
+        active = self.active
+        pairs = []
+        for i, (x, y, label) in enumerate(tips):
+            for hand in self.hands.values():
+                d = math.hypot(x - hand.x, y - hand.y)
+                if d <= MAX_JUMP:
+                    pairs.append((d + (_OTHER_HAND if label != hand.label else 0.0), i, hand.id))
+        pairs.sort()
+
+        matched: list[Hand | None] = [None] * len(tips)
+        taken: set[int] = set()
+        for _, i, hand_id in pairs:
+            if matched[i] is None and hand_id not in taken:
+                matched[i] = self.hands[hand_id]
+                taken.add(hand_id)
+
+        dropped = []
+        for hand in list(self.hands.values()):
+            if hand.id in taken:
+                hand.missed = 0
+                continue
+            hand.missed += 1
+            if hand.missed > LOST_FRAMES:
+                del self.hands[hand.id]
+                dropped.append(hand)
+                if hand is active:
+                    self.default_brush = hand.brush
+
+        for i, (x, y, label) in enumerate(tips):
+            hand = matched[i]
+            if hand is None:
+                hand = matched[i] = self._takeover(x, y, taken) or self._new_hand()
+                taken.add(hand.id)
+            hand.x, hand.y, hand.label = x, y, label
+        return matched, dropped
+
+    def _takeover(self, x: float, y: float, taken: set[int]) -> Hand | None:
+        """At ``MAX_HANDS``: the nearest missing hand, which must have jumped."""
+        if len(self.hands) < MAX_HANDS:
+            return None
+        missing = [h for h in self.hands.values() if h.id not in taken]
+        if not missing:
+            return None
+        hand = min(missing, key=lambda h: math.hypot(x - h.x, y - h.y))
+        hand.missed = 0
+        hand.stroke.prev = None   # no line across the jump
+        return hand
+
+    def _new_hand(self) -> Hand:
+        hand_id = next(i for i in range(len(self.hands) + 1) if i not in self.hands)
+        hand = self.hands[hand_id] = Hand(hand_id, replace(self.brush))
+        return hand
@@ -0,0 +1,96 @@
+# headless.py
+
+"""A Tk-free stand-in for ``tk.Canvas``.
+
+Implements the part of the canvas API the app and ``brushes.py`` draw with,
+keeping every item in a dict instead of on screen, so drawing code can run
+without a display – in ``bench.py`` and for headless replays.
+"""
+from __future__ import annotations
+
+import itertools
+from typing import Any
+
+
+class HeadlessCanvas:
+    def __init__(self, width: int = 1300, height: int = 700, bg: str = "white") -> None:
+        self.width = width
+        self.height = height
+        self._options: dict[str, Any] = {"bg": bg}
+        self._ids = itertools.count(1)
+        # id → [kind, coords, options]
+        self.items: dict[int, list] = {}
+
+    # -- item creation ----------------------------------------------------
+    def _create(self, kind: str, args: tuple, options: dict) -> int:
+        coords = list(args[0]) if len(args) == 1 and isinstance(args[0], (list, tuple)) else list(args)
+        item = next(self._ids)
+        self.items[item] = [kind, coords, options]
+        return item
+
+    def create_line(self, *args, **options) -> int:
+        return self._create("line", args, options)
+
+    def create_oval(self, *args, **options) -> int:
+        return self._create("oval", args, options)
+
+    def create_polygon(self, *args, **options) -> int:
+        return self._create("polygon", args, options)
+
+    def create_rectangle(self, *args, **options) -> int:
+        return self._create("rectangle", args, options)
+
+    def create_text(self, *args, **options) -> int:
+        return self._create("text", args, options)
+
+    # -- item access ------------------------------------------------------
+    def _select(self, tag_or_id) -> list[int]:
+        if isinstance(tag_or_id, int):
+            return [tag_or_id] if tag_or_id in self.items else []
+        if tag_or_id == "all":
+            return list(self.items)
+        return [i for i, (_, _, opts) in self.items.items() if _has_tag(opts.get("tags"), tag_or_id)]
+
+    def coords(self, tag_or_id, *args):
+        ids = self._select(tag_or_id)
+        if not args:
+            return list(self.items[ids[0]][1]) if ids else []
+        coords = list(args[0]) if len(args) == 1 and isinstance(args[0], (list, tuple)) else list(args)
+        for i in ids:
+            self.items[i][1] = coords
+
+    def itemconfig(self, tag_or_id, **options) -> None:
+        for i in self._select(tag_or_id):
+            self.items[i][2].update(options)
+
+    def delete(self, *tags_or_ids) -> None:
+        for tag in tags_or_ids:
+            for i in self._select(tag):
+                del self.items[i]
+
+    def tag_raise(self, *_args) -> None:
+        pass
+
+    def find_withtag(self, tag_or_id) -> tuple[int, ...]:
+        return tuple(self._select(tag_or_id))
+
+    # -- widget bits ------------------------------------------------------
+    def winfo_width(self) -> int:
+        return self.width
+
+    def winfo_height(self) -> int:
+        return self.height
+
+    def __getitem__(self, key: str) -> Any:
+        return self._options[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._options[key] = value
+
+
+def _has_tag(tags, tag: str) -> bool:
+    if tags is None:
+        return False
+    if isinstance(tags, str):
+        return tags == tag or tag in tags.split()
+    return tag in tags
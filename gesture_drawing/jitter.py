@@ -0,0 +1,107 @@
+# jitter.py
+
+"""Jitter buffering and interpolation for remote strokes and cursors.
+
+Peers stamp ``line`` and ``cursor`` events with their wall-clock send time
+(``ts``).  Instead of drawing them whenever ``_poll_network`` happens to
+run, the receiver plays them out a fixed ``delay`` behind the sender, which
+hides network jitter and lets cursors be interpolated between samples.
+"""
+from __future__ import annotations
+
+from collections import deque
+from itertools import islice
+from typing import Any
+
+
+class PlayoutClock:
+    """Maps sender timestamps onto the local (monotonic) clock."""
+
+    __slots__ = ("delay", "_offset")
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self._offset: float | None = None  # local − sender for the fastest packet
+
+    def observe(self, ts: float, now: float) -> None:
+        offset = now - ts
+        if self._offset is None or offset < self._offset:
+            self._offset = offset
+        else:
+            # drift slowly towards slower paths so one lucky packet can't
+            # pin the playout point forever
+            self._offset += (offset - self._offset) * 0.01
+
+    def local(self, ts: float) -> float:
+        return ts + (self._offset or 0.0) + self.delay
+
+    def sender(self, now: float) -> float:
+        return now - (self._offset or 0.0) - self.delay
+
+
+class JitterBuffer:
+    """FIFO that releases items once their sender time + delay has passed.
+
+    One per sender: the clock offset is only meaningful for a single clock.
+    """
+
+    def __init__(self, delay: float) -> None:
+        self.clock = PlayoutClock(delay)
+        self.last_seen = 0.0   # local time of the newest push
+        self._items: deque[tuple[float, Any]] = deque()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def push(self, ts: float, item: Any, now: float) -> None:
+        self.clock.observe(ts, now)
+        self.last_seen = now
+        self._items.append((ts, item))
+
+    def pop_due(self, now: float) -> list[Any]:
+        items, local = self._items, self.clock.local
+        out = []
+        while items and local(items[0][0]) <= now:
+            out.append(items.popleft()[1])
+        return out
+
+    def drain(self) -> list[Any]:
+        out = [item for _, item in self._items]
+        self._items.clear()
+        return out
+
+
+class CursorTrack:
+    """Recent samples of one peer's cursor, interpolated at playout time."""
+
+    def __init__(self, delay: float, max_predict: float = 0.1) -> None:
+        self.clock = PlayoutClock(delay)
+        self.max_predict = max_predict
+        self.last_seen = 0.0   # local time of the newest push
+        self._samples: deque[tuple[float, float, float]] = deque(maxlen=8)
+
+    def push(self, ts: float, x: float, y: float, now: float) -> None:
+        self.clock.observe(ts, now)
+        self.last_seen = now
+        if self._samples and ts <= self._samples[-1][0]:
+            return  # stale / duplicate
+        self._samples.append((ts, x, y))
+
+    def position(self, now: float) -> tuple[float, float] | None:
+        s = self._samples
+        if not s:
+            return None
+        t = self.clock.sender(now)
+        if t <= s[0][0]:
+            return s[0][1], s[0][2]
+        for (t0, x0, y0), (t1, x1, y1) in zip(s, islice(s, 1, None)):
+            if t <= t1:
+                a = (t - t0) / (t1 - t0)
+                return x0 + (x1 - x0) * a, y0 + (y1 - y0) * a
+        # past the newest sample: predict along the last velocity, briefly
+        t1, x1, y1 = s[-1]
+        if len(s) < 2:
+            return x1, y1
+        t0, x0, y0 = s[-2]
+        dt = min(t - t1, self.max_predict)
+        return x1 + (x1 - x0) / (t1 - t0) * dt, y1 + (y1 - y0) / (t1 - t0) * dt
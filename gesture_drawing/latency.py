@@ -0,0 +1,107 @@
+# latency.py
+
+"""Where does a voice command's time go?
+
+Each utterance gets a :class:`Trace` that is stamped as it moves through
+the pipeline::
+
+    speech_end → recognised → normalised → applied
+       (audio.py)   (audio.py)   (voice.py)   (after _handle_command)
+
+Finished traces feed a :class:`LatencyTracker` that keeps rolling
+percentiles per stage; it is printed to the log and, with
+``--latency-overlay``, drawn on the canvas.  ``llm_router`` additionally
+records the raw HTTP time as ``llm_http``.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+
+OVERLAY = False  # set this in your main.py (--latency-overlay)
+
+STAGES = ("speech_end", "recognised", "normalised", "applied")
+# reported segments: name → (from stage, to stage)
+SEGMENTS = {
+    "recognition": ("speech_end", "recognised"),
+    "normalisation": ("recognised", "normalised"),
+    "apply": ("normalised", "applied"),
+    "total": ("speech_end", "applied"),
+}
+
+
+class Trace:
+    __slots__ = ("marks", "source", "command")
+
+    def __init__(self) -> None:
+        self.marks: dict[str, float] = {}
+        self.source = "local"   # local / llm / partial / fallback
+        self.command: str | None = None
+
+    def mark(self, stage: str, at: float | None = None) -> "Trace":
+        self.marks[stage] = time.perf_counter() if at is None else at
+        return self
+
+    def ms(self, start: str, end: str) -> float | None:
+        if start in self.marks and end in self.marks:
+            return (self.marks[end] - self.marks[start]) * 1000
+        return None
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 200, report_every: int = 10) -> None:
+        self.window = window
+        self.report_every = report_every
+        self._samples: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+        self._finished = 0
+
+    def observe(self, segment: str, ms: float) -> None:
+        with self._lock:
+            self._samples.setdefault(segment, deque(maxlen=self.window)).append(ms)
+
+    def record(self, trace: Trace) -> None:
+        """A command was applied – log its breakdown and keep the numbers."""
+        parts = []
+        for name, (a, b) in SEGMENTS.items():
+            ms = trace.ms(a, b)
+            if ms is not None:
+                self.observe(name, ms)
+                parts.append(f"{name} {ms:.0f}ms")
+        print(f"[latency] {trace.command} via {trace.source}: " + ", ".join(parts))
+        self._finished += 1
+        if self._finished % self.report_every == 0:
+            print(f"[latency] rolling: {self.summary_line()}")
+
+    def percentiles(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            snap = {k: sorted(v) for k, v in self._samples.items() if v}
+        return {
+            k: {p: v[min(len(v) - 1, int(len(v) * q))] for p, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))}
+            for k, v in snap.items()
+        }
+
+    def summary_line(self) -> str:
+        pct = self.percentiles()
+        order = [*SEGMENTS, *sorted(k for k in pct if k not in SEGMENTS)]
+        return " | ".join(
+            f"{k} p50 {pct[k]['p50']:.0f} / p90 {pct[k]['p90']:.0f} ms" for k in order if k in pct
+        )
+
+
+tracker = LatencyTracker()
+
+_current: Trace | None = None
+
+
+def begin(at: float | None = None) -> Trace:
+    """Start the trace for a new utterance (called by the audio service)."""
+    global _current
+    _current = Trace().mark("speech_end", at)
+    return _current
+
+
+def current() -> Trace:
+    """The trace of the utterance being delivered right now."""
+    return _current if _current is not None else begin()
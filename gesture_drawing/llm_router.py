@@ -1,53 +1,116 @@
 # llm_router.py
 from __future__ import annotations
-import requests
-from functools import lru_cache
-from typing import Optional
+import atexit
+import itertools
 import os
-from .config import API_KEY, API_URL
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional
 
-HEADERS = {
-    "Content-Type": "application/json",
-    "Authorization": f"Bearer {API_KEY}",
-}
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import config, grammar, latency
+from .command_cache import MISS, CommandCache, prompt_version
+from .config import API_KEY
+from .grammar import normalise_text
 
-SYSTEM_PROMPT = """\
-You are a command parser. If the message is unrelated to drawing, reply with nothing.
-
-When the user requests a color change, always reply with:
-  CHANGE COLOR TO <COLOR>
-replacing <COLOR> with the exact color they mention.
-
-When the user requests a brush change but does not name one, reply:
-  BRUSH
-
-When the user wants to put a square on the canvas, reply:
-    SQUARE
-    
-When the user wants to put a circle on the canvas, reply:
-    CIRCLE
-    
-When the user wants to erase something, reply:
-    ERASER
-    
-When the user wants to start drawing, reply:
-    START
-    
-When the user wants to stop drawing, reply:
-    STOP
-
-WHen the user wants to submit his guess, reply:
-    MY GUESS IS <word>
-
-Do not explain or comment.
-"""
+# Point this at a local stand-in (e.g. http://127.0.0.1:8000/v1/chat/completions)
+# for testing – via GESTURE_LLM_URL or by setting it in main.py (--llm-url).
+API_URL = os.environ.get("GESTURE_LLM_URL", config.API_URL)
+
+# Give up on the LLM after this long and fall back to the local grammar.
+LATENCY_BUDGET_S = 3.0
+CONNECT_TIMEOUT_S = 2.0
 
 HEADERS = {
     "Content-Type": "application/json",
     "Authorization": f"Bearer {API_KEY}",
 }
 
-def _call_llm(system_prompt: str, user_text: str, max_tokens=15) -> Optional[str]:
+# one keep-alive session: the TLS handshake happens once, not per command
+_session = requests.Session()
+_session.headers.update(HEADERS)
+_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+_session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="llm")
+
+
+class LLMUnavailable(Exception):
+    """The LLM could not be reached in time (not the same as "no command")."""
+
+
+# ── PROMPTS ────────────────────────────────────────────────────────────────────
+# One short prompt per mode, built once at import. Only the commands that
+# make sense in a mode are listed, and the reply is capped at a few tokens.
+# Bump PROMPT_VERSION when a change in meaning must invalidate cached
+# answers; pure wording edits are caught by the content hash anyway.
+PROMPT_VERSION = 2
+
+_NOTHING = ("", "NOTHING", "NO_COMMAND")
+_BRUSH_NAMES = grammar.BRUSHES[:-1]          # the popup can't pick the eraser
+
+
+def _command(reply: str) -> Optional[str]:
+    reply = reply.strip().upper()
+    return None if reply in _NOTHING else reply
+
+
+def _brush(reply: str) -> Optional[str]:
+    reply = reply.strip().lower()
+    return reply if reply in _BRUSH_NAMES else None
+
+
+@dataclass(slots=True, frozen=True)
+class Prompt:
+    key: str                                   # mode[.intent] – cache namespace
+    system: str
+    max_tokens: int
+    parse: Callable[[str], Optional[str]]
+    version: str
+
+
+def _prompt(
+    key: str, system: str, max_tokens: int, parse: Callable[[str], Optional[str]] = _command
+) -> Prompt:
+    return Prompt(key, system, max_tokens, parse, f"{PROMPT_VERSION}-{prompt_version(system)}")
+
+
+PROMPTS: dict[str, Prompt] = {p.key: p for p in (
+    _prompt("draw",
+            "Map a drawing-app voice command to exactly one of: START, STOP, SQUARE, "
+            "CIRCLE, ERASER, BRUSH, CHANGE COLOR TO <colour>, CHANGE BRUSH TO <brush>. "
+            "Otherwise reply NOTHING.", 8),
+    # narrower prompts, chosen when the local grammar already sees the intent
+    _prompt("draw.colour",
+            "The user wants a new drawing colour. Reply CHANGE COLOR TO <colour> "
+            "with the colour they named, or NOTHING.", 8),
+    _prompt("draw.brush",
+            f"The user wants a new brush. Reply CHANGE BRUSH TO <brush>, one of "
+            f"{', '.join(grammar.BRUSHES)}; or NOTHING.", 8),
+    _prompt("place",
+            "The user is sizing a shape. Reply PLACE if they want it put down "
+            "('place', 'play', 'there', 'done'), STOP to stop, otherwise NOTHING.", 3),
+    _prompt("brush",
+            f"Reply with the brush named, one of {', '.join(_BRUSH_NAMES)} "
+            f"('are' means air); otherwise NOTHING.", 4, _brush),
+    _prompt("guess",
+            "Pictionary: reply MY GUESS IS <word> with the word the user is "
+            "guessing, verbatim; otherwise NOTHING.", 10),
+)}
+
+# speculative intent: a weak local match that starts with one of these
+# prefixes is sent with the narrower prompt instead of the full one
+_INTENTS = {
+    "draw": (("CHANGE COLOR TO ", "draw.colour"), ("CHANGE BRUSH TO ", "draw.brush")),
+}
+SPECULATE_CONFIDENCE = 0.5
+
+
+def _call_llm(system_prompt: str, user_text: str, max_tokens: int = 15) -> Optional[str]:
     payload = {
         "model": "allam-2-7b",
         "messages": [
@@ -58,77 +121,100 @@ def _call_llm(system_prompt: str, user_text: str, max_tokens=15) -> Optional[str
         "temperature": 0.0,
         "stop": ["\n"],
     }
+    t0 = time.perf_counter()
     try:
-        resp = requests.post(API_URL, headers=HEADERS, json=payload, timeout=10)
+        resp = _session.post(API_URL, json=payload, timeout=(CONNECT_TIMEOUT_S, LATENCY_BUDGET_S))
         resp.raise_for_status()
         return resp.json()["choices"][0]["message"]["content"].strip()
     except Exception as e:
-        print(f"[llm_router] Error contacting LLM: {e}")
-        return None
-
-@lru_cache(maxsize=1024)
-def normalise(text: str) -> Optional[str]:
-    # your existing SYSTEM_PROMPT as before
-    reply = _call_llm(SYSTEM_PROMPT, text).upper()
-    return None if reply == "NO_COMMAND" else reply
-
-@lru_cache(maxsize=1024)
-def normalise_place(text: str) -> Optional[str]:
-    PLACE_PROMPT = """\
-    You are in shape‐preview mode (square or circle). The user is sizing a shape on the canvas.
-    "play" = place
-
-    If the user says "Circle" or "square", reply with:
-        PLACE
-
-    If you detect any attempt of finishing the placement of the shape, reply with:
-        PLACE
-    If the user tells you to put it somewhere (eg. "right there", "there"), reply with:
-        PLACE
-
-    If the message is unrelated reply with NOTHING.
-    Do not explain or comment."""
-    reply = _call_llm(PLACE_PROMPT, text)
-    if not reply:
-        return None
-    return reply.strip().upper()
-
-@lru_cache(maxsize=1024)
-def normalise_brush(text: str) -> Optional[str]:
-    BRUSH_PROMPT = """\
-    You are a voice command parser in brush-selection mode.
-    If there is no Brush type specified, reply with NOTHING.
-
-    If there is a Brush type specified, reply with the exact name of the brush type.
-
-    if they say are they mean air.
-
-    Brush types include:
-    solid, air, texture, calligraphy, blending, shining
-
-    Do not explain or comment.
+        raise LLMUnavailable(str(e)) from e
+    finally:
+        latency.tracker.observe("llm_http", (time.perf_counter() - t0) * 1000)
+
+
+_cache: CommandCache | None = None
+_cache_lock = threading.Lock()   # both pool threads may ask first
+
+def _get_cache() -> CommandCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = CommandCache()
+                atexit.register(lambda: print(f"[llm_router] command cache: {cache_stats()}"))
+    return _cache
+
+def cache_stats() -> dict:
+    return _get_cache().stats()
+
+# ── NON-BLOCKING API ───────────────────────────────────────────────────────────
+_generation = itertools.count(1)
+_latest = 0
+_inflight: Future | None = None
+_submit_lock = threading.Lock()
+
+def submit(
+    fn: Callable[[str], Optional[str]],
+    text: str,
+    on_done: Callable[[Optional[str]], None],
+) -> Future:
+    """Run ``fn(text)`` (e.g. :func:`normalise`) on the LLM pool.
+
+    ``on_done(result)`` is called from a pool thread – unless a newer
+    utterance was submitted meanwhile, in which case the stale result is
+    dropped (and the request is cancelled outright if it had not started).
     """
-    reply = _call_llm(BRUSH_PROMPT, text)
-    if not reply or reply.strip().lower() == "nothing":
+    global _latest, _inflight
+    with _submit_lock:
+        gen = _latest = next(_generation)
+        if _inflight is not None:
+            _inflight.cancel()
+        fut = _inflight = _executor.submit(fn, text)
+
+    def _finished(f: Future) -> None:
+        if f.cancelled():
+            return
+        if gen != _latest:
+            print(f"[llm_router] Dropped stale reply for {text!r}")
+            return
+        on_done(f.result())
+
+    fut.add_done_callback(_finished)
+    return fut
+
+
+# ── ROUTER ─────────────────────────────────────────────────────────────────────
+def prompt_for(local: Optional[grammar.Match], mode: str) -> Prompt:
+    """The narrowest prompt for *mode* given an unsure local match."""
+    if local is not None and local.confidence >= SPECULATE_CONFIDENCE:
+        for prefix, key in _INTENTS.get(mode, ()):
+            if local.command.startswith(prefix):
+                return PROMPTS[key]
+    return PROMPTS[mode]
+
+
+def ask(prompt: Prompt, text: str) -> Optional[str]:
+    """One LLM call with *prompt*, persistently cached (see command_cache.py).
+
+    Keyed on the normalised transcript plus the prompt version, so "Start!"
+    and "start" share an entry and editing a prompt starts afresh. Failed
+    LLM calls are not cached.
+    """
+    key = normalise_text(text)
+    cached = _get_cache().get(prompt.key, prompt.version, key)
+    if cached is not MISS:
+        return cached
+    try:
+        reply = _call_llm(prompt.system, text, prompt.max_tokens)
+    except LLMUnavailable as e:
+        print(f"[llm_router] Error contacting LLM: {e}")
         return None
-    return reply.strip().lower()
-
-@lru_cache(maxsize=1024)
-def normalise_guess(text: str) -> Optional[str]:
-    GUESS_PROMPT = """\
-    You are a voice‐guess parser in a Pictionary game.
-    When the user speaks a word or phrase intended as their guess for the current drawing,
-    you must find the single word the user is guessing and reply with exactly:
+    result = prompt.parse(reply or "")
+    _get_cache().put(prompt.key, prompt.version, key, result)
+    return result
 
-    MY GUESS IS <word>
 
-    replacing `<word>` with exactly what they said (do not translate or paraphrase).
-    If the utterance is not a guess, reply with:
-
-    NOTHING
+def normalise(text: str) -> Optional[str]:
+    """Draw-mode command for *text* straight from the LLM (cached)."""
+    return ask(PROMPTS["draw"], text)
 
-    Do not explain or comment."""
-    reply = _call_llm(GUESS_PROMPT, text)
-    if not reply or reply.strip().lower() == "nothing":
-        return None
-    return reply.strip().lower()
\ No newline at end of file
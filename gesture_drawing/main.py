@@ -5,8 +5,10 @@ import sys
 import argparse
 import tkinter as tk
 
-from . import voice
+from . import audio, gestures, hand_tracking, latency, network, profiler, recording, voice, voice_process, words
+from .recognisers import make_recogniser
 
+# camera, hand model and LLM code load later (see GestureDrawingApp._load_vision)
 from .gesture_app import GestureDrawingApp
 
 def main() -> None:
@@ -17,14 +19,110 @@ def main() -> None:
         action="store_true",
         help="Use the LLM to normalise voice commands",
     )
+    parser.add_argument(
+        "--room",
+        default=network.ROOM,
+        help="Relay room to join; players in the same room share a canvas",
+    )
+    parser.add_argument(
+        "--spectate",
+        action="store_true",
+        help="Watch the room read-only: no camera or voice, batched updates from the relay",
+    )
+    parser.add_argument(
+        "--llm-url",
+        default=None,
+        help="Chat-completions endpoint to use instead of config.API_URL (e.g. a local stand-in)",
+    )
+    parser.add_argument(
+        "--recogniser",
+        choices=("google", "vosk", "fixture"),
+        default="google",
+        help="Speech engine: Google cloud, offline Vosk (streaming) or a text fixture",
+    )
+    parser.add_argument("--vosk-model", help="Path to a Vosk model directory")
+    parser.add_argument("--voice-fixture", help="Text file of utterances for --recogniser fixture")
+    parser.add_argument(
+        "--words",
+        action="append",
+        default=[],
+        metavar="FILE",
+        help="Prompt word list, one word per line (repeatable; default: built-in list)",
+    )
+    parser.add_argument(
+        "--hands",
+        type=int,
+        default=hand_tracking.MAX_HANDS,
+        help="How many hands to track; each gets its own pointer, brush and stroke (default 2)",
+    )
+    parser.add_argument(
+        "--no-gestures",
+        action="store_true",
+        help="Disable pinch / open-palm drawing control (voice and spacebar only)",
+    )
+    parser.add_argument(
+        "--voice-process",
+        action="store_true",
+        help="Run speech recognition and normalisation in a separate process",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time each stage of the frame loop and show FPS/percentiles on the canvas",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Write every profiled span to FILE (Chrome trace JSON, or CSV for *.csv)",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="FILE",
+        help="Record every sent/applied event to FILE (replay: python -m gesture_drawing.recording FILE)",
+    )
+    parser.add_argument(
+        "--latency-overlay",
+        action="store_true",
+        help="Show rolling voice-command latency percentiles on the canvas",
+    )
     args = parser.parse_args()
 
-    # 2. set the global in voice.py
+    # 2. set the globals in voice.py / network.py
     voice.USE_LLM = args.llm
+    network.ROOM = args.room
+    network.ROLE = "spectator" if args.spectate else "player"
+    latency.OVERLAY = args.latency_overlay
+    profiler.ENABLED = args.profile
+    profiler.TRACE_PATH = args.trace
+    recording.RECORD_PATH = args.record
+    words.WORD_FILES = args.words
+    if args.hands < 1:
+        parser.error("--hands must be at least 1")
+    hand_tracking.MAX_HANDS = args.hands
+    gestures.ENABLED = not args.no_gestures
+    try:
+        words.get_index()   # fail on a bad list now, not when the window is up
+    except (OSError, ValueError) as e:
+        parser.error(f"--words: {e}")
+    if args.llm:   # requests & co. are only imported when the LLM is used
+        from . import llm_router
+        if args.llm_url:
+            llm_router.API_URL = args.llm_url
+    elif args.llm_url:
+        print("--llm-url has no effect without --llm")
+    voice_process.ENABLED = args.voice_process
+    voice_process.RECOGNISER = (args.recogniser, args.vosk_model, args.voice_fixture)
+    if not (args.voice_process or args.spectate):  # otherwise the child builds its own / no voice
+        try:
+            audio.service.configure(
+                make_recogniser(args.recogniser, model=args.vosk_model, fixture=args.voice_fixture)
+            )
+        except (ValueError, RuntimeError) as e:
+            parser.error(str(e))
 
     # 3. start your app
     root = tk.Tk()
-    app = GestureDrawingApp(root)
+    app = GestureDrawingApp(root, spectate=args.spectate)
     try:
         root.mainloop()
     except KeyboardInterrupt:
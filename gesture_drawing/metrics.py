@@ -0,0 +1,156 @@
+# metrics.py
+
+"""Counters and histograms for the websocket relay (see ``server.py``)."""
+from __future__ import annotations
+
+import bisect
+import time
+from collections import Counter
+
+
+class Histogram:
+    """Fixed-bucket histogram – cheap enough to update on every message."""
+
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last bucket = +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the *q*-th observation."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.bounds, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+# seconds – fan-out of one message to every peer
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+# bytes – one websocket frame
+SIZE_BUCKETS = (64, 128, 256, 512, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class RelayMetrics:
+    """Everything the relay counts, keyed by event type and client id."""
+
+    def __init__(self) -> None:
+        self.started = time.time()
+        self.msgs_in: Counter[str] = Counter()    # type → n
+        self.msgs_out: Counter[str] = Counter()
+        self.bytes_in: Counter[str] = Counter()
+        self.bytes_out: Counter[str] = Counter()
+        self.client_msgs_in: Counter[str] = Counter()  # client id → n
+        self.client_bytes_in: Counter[str] = Counter()
+        self.dropped: Counter[str] = Counter()    # reason → n
+        self.fanout_latency = Histogram(LATENCY_BUCKETS)
+        self.msg_size = Histogram(SIZE_BUCKETS)
+
+    # -- hooks called from server.handler ---------------------------------
+    def on_receive(self, client_id: str | None, kind: str, size: int) -> None:
+        self.msgs_in[kind] += 1
+        self.bytes_in[kind] += size
+        self.msg_size.observe(size)
+        if client_id:
+            self.client_msgs_in[client_id] += 1
+            self.client_bytes_in[client_id] += size
+
+    def on_send(self, kind: str, size: int, n: int = 1) -> None:
+        self.msgs_out[kind] += n
+        self.bytes_out[kind] += size * n
+
+    def on_drop(self, reason: str, n: int = 1) -> None:
+        self.dropped[reason] += n
+
+    def on_fanout(self, seconds: float) -> None:
+        self.fanout_latency.observe(seconds)
+
+    def forget_client(self, client_id: str) -> None:
+        self.client_msgs_in.pop(client_id, None)
+        self.client_bytes_in.pop(client_id, None)
+
+    # -- reporting --------------------------------------------------------
+    def snapshot(self, clients: dict, rooms: int = 0) -> dict:
+        """JSON-friendly view; *clients* is the relay's ``id → ws`` map."""
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "clients": len(clients),
+            "rooms": rooms,
+            "msgs_in": dict(self.msgs_in),
+            "msgs_out": dict(self.msgs_out),
+            "bytes_in": dict(self.bytes_in),
+            "bytes_out": dict(self.bytes_out),
+            "dropped": dict(self.dropped),
+            "fanout_latency_s": self.fanout_latency.summary(),
+            "msg_size_bytes": self.msg_size.summary(),
+            "per_client": {
+                cid: {
+                    "msgs_in": self.client_msgs_in.get(cid, 0),
+                    "bytes_in": self.client_bytes_in.get(cid, 0),
+                    "queue_bytes": queue_depth(ws),
+                }
+                for cid, ws in clients.items()
+            },
+        }
+
+    def render_text(self, clients: dict, rooms: int = 0) -> str:
+        """Prometheus-style plain text for the HTTP endpoint."""
+        out = [
+            f"relay_uptime_seconds {time.time() - self.started:.1f}",
+            f"relay_connected_clients {len(clients)}",
+            f"relay_rooms {rooms}",
+        ]
+        for name, counter in (
+            ("relay_messages_in_total", self.msgs_in),
+            ("relay_messages_out_total", self.msgs_out),
+            ("relay_bytes_in_total", self.bytes_in),
+            ("relay_bytes_out_total", self.bytes_out),
+        ):
+            out.extend(f'{name}{{type="{k}"}} {v}' for k, v in sorted(counter.items()))
+        out.extend(f'relay_dropped_total{{reason="{k}"}} {v}' for k, v in sorted(self.dropped.items()))
+        for name, hist in (
+            ("relay_fanout_latency_seconds", self.fanout_latency),
+            ("relay_message_size_bytes", self.msg_size),
+        ):
+            seen = 0
+            for bound, n in zip(hist.bounds, hist.counts):
+                seen += n
+                out.append(f'{name}_bucket{{le="{bound}"}} {seen}')
+            out.append(f'{name}_bucket{{le="+Inf"}} {hist.count}')
+            out.append(f"{name}_sum {hist.total}")
+            out.append(f"{name}_count {hist.count}")
+        for cid, ws in sorted(clients.items()):
+            out.append(f'relay_client_messages_in_total{{client="{cid}"}} {self.client_msgs_in.get(cid, 0)}')
+            out.append(f'relay_client_bytes_in_total{{client="{cid}"}} {self.client_bytes_in.get(cid, 0)}')
+            out.append(f'relay_client_queue_bytes{{client="{cid}"}} {queue_depth(ws)}')
+        return "\n".join(out) + "\n"
+
+
+def queue_depth(ws) -> int:
+    """Bytes written to *ws* but not yet flushed to the socket."""
+    transport = getattr(ws, "transport", None)
+    try:
+        return transport.get_write_buffer_size() if transport else 0
+    except Exception:
+        return 0
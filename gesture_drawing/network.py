@@ -1,40 +1,76 @@
 # network.py
-import asyncio, json, threading, uuid
+import asyncio, threading, uuid
 import websockets
 from queue import Queue
+from urllib.parse import urlsplit, urlunsplit
+from . import envelope
+from .config import ROOM as DEFAULT_ROOM, WS_COMPRESSION, COMPRESS_THRESHOLD, COMPRESS_LEVEL, MAX_FRAME_SIZE
 
 _send_q = Queue()
 _recv_q = Queue()
-_my_id  = str(uuid.uuid4()) 
-
-async def _ws_loop(uri):
-    async with websockets.connect(uri) as ws:
-        # ① send one “hello” so the host can map my socket ↔ id
-        await ws.send(json.dumps({"type": "hello", "id": _my_id}))
-        async def _reader():
-            async for msg in ws:
-                _recv_q.put(json.loads(msg))
-        async def _writer():
-            loop = asyncio.get_event_loop()
-            while True:
-                data = await loop.run_in_executor(None, _send_q.get)
-                await ws.send(json.dumps(data))
-        await asyncio.gather(_reader(), _writer())
-
-def start_client(uri: str):
-    t = threading.Thread(target=lambda: asyncio.run(_ws_loop(uri)), daemon=True)
+_my_id  = str(uuid.uuid4())
+
+ROOM = DEFAULT_ROOM  # set this in your main.py (--room)
+ROLE = "player"     # set this in your main.py (--spectate → "spectator")
+
+def _with_port(uri: str, port: int) -> str:
+    parts = urlsplit(uri)
+    host = parts.hostname or ""
+    if ":" in host:   # IPv6 literal: hostname comes back without its brackets
+        host = f"[{host}]"
+    return urlunsplit(parts._replace(netloc=f"{host}:{port}"))
+
+async def _ws_loop(uri, room):
+    while True:
+        async with websockets.connect(uri, compression=WS_COMPRESSION, max_size=MAX_FRAME_SIZE) as ws:
+            # ① send one “hello” so the host can map my socket ↔ id and room
+            hello = {"type": "hello", "id": _my_id, "room": room, "role": ROLE}
+            await ws.send(envelope.pack(hello, room=room, sender=_my_id))
+            # ② the relay answers with “welcome”, or – when it runs several
+            #    worker processes – with the port of the worker owning the room
+            msg = await ws.recv()
+            first = envelope.unpack(msg)
+            if first.get("type") == "redirect":
+                uri = _with_port(uri, first["port"])
+                continue
+            if first.get("type") != "welcome":
+                _recv_q.put((envelope.peek(msg).sender, first))
+            async def _reader():
+                async for msg in ws:
+                    data = envelope.unpack(msg)
+                    if data.get("type") == "batch":   # spectators: many events per frame
+                        for sender, ev in zip(data["senders"], data["events"]):
+                            _recv_q.put((sender, ev))
+                    else:
+                        _recv_q.put((envelope.peek(msg).sender, data))
+            async def _writer():
+                loop = asyncio.get_event_loop()
+                while True:
+                    data, target = await loop.run_in_executor(None, _send_q.get)
+                    # one cursor per tracked hand: say which in the header
+                    key = data["id"] if data["type"] in ("cursor", "cursor_gone") else ""
+                    await ws.send(envelope.pack(
+                        data, room=room, sender=_my_id, target=target, key=key,
+                        compress_over=COMPRESS_THRESHOLD, compress_level=COMPRESS_LEVEL,
+                    ))
+            await asyncio.gather(_reader(), _writer())
+            return
+
+def start_client(uri: str, room: str | None = None):
+    room = room or ROOM
+    t = threading.Thread(target=lambda: asyncio.run(_ws_loop(uri, room)), daemon=True)
     t.start()
 
-# helper for directed messages
+# helper for directed messages (the target travels in the envelope only)
 def send_direct(peer_id: str, payload: dict):
-    payload = {"to": peer_id, **payload}
-    _send_q.put(payload)
+    _send_q.put((payload, peer_id))
 
 
 def broadcast_event(data: dict):
-    _send_q.put(data)
+    _send_q.put((data, ""))
 
-def get_events() -> list[dict]:
+def get_events() -> list[tuple[str, dict]]:
+    """``(sender id, event)`` for everything received since the last call."""
     evs = []
     while True:
         try:
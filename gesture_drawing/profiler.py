@@ -0,0 +1,148 @@
+# profiler.py
+
+"""Opt-in per-stage frame profiler (``--profile`` / ``--trace FILE``).
+
+``GestureDrawingApp`` wraps each stage of its loops in ``span(name)``:
+
+    capture    camera read + mirror
+    inference  colour conversion + MediaPipe
+    hand       landmark handling (includes brush)
+    brush      brush events, rendering and broadcast
+    preview    landmark overlay + preview image
+    network    one _poll_network tick
+
+The profiler keeps rolling per-stage percentiles and the frame rate for the
+on-canvas HUD, and with ``--trace`` streams every span to a Chrome trace
+(``chrome://tracing`` / Perfetto; any file name) or, for ``*.csv``, to CSV.
+When profiling is off ``span`` returns a shared no-op context manager.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import TextIO
+
+ENABLED = False                 # set this in your main.py (--profile)
+TRACE_PATH: str | None = None   # set this in your main.py (--trace)
+
+STAGES = ("capture", "inference", "hand", "brush", "preview", "network")
+
+_NULL = nullcontext()
+
+
+class _Span:
+    __slots__ = ("_prof", "_name", "_t0")
+
+    def __init__(self, prof: "Profiler", name: str) -> None:
+        self._prof = prof
+        self._name = name
+
+    def __enter__(self) -> None:
+        self._t0 = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        self._prof.record(self._name, self._t0, time.perf_counter())
+
+
+class Profiler:
+    def __init__(self, window: int = 300, trace_path: str | None = None) -> None:
+        self.window = window
+        self._samples: dict[str, deque[float]] = {s: deque(maxlen=window) for s in STAGES}
+        self._frames: deque[float] = deque(maxlen=window)
+        self._epoch = time.perf_counter()
+        self._trace: TextIO | None = None
+        self._csv = False
+        self._lock = threading.Lock()
+        if trace_path:
+            self._open_trace(trace_path)
+
+    # -- recording --------------------------------------------------------
+    def span(self, name: str) -> _Span:
+        return _Span(self, name)
+
+    def frame(self) -> None:
+        """Call once per camera frame (for the FPS figure)."""
+        self._frames.append(time.perf_counter())
+
+    def record(self, name: str, start: float, end: float) -> None:
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples[name] = deque(maxlen=self.window)
+        samples.append((end - start) * 1000)
+        if self._trace is not None:   # unlocked fast path when not tracing
+            ts = (start - self._epoch) * 1e6
+            dur = (end - start) * 1e6
+            with self._lock:
+                trace = self._trace   # close() may have run since the check above
+                if trace is None:
+                    return
+                if self._csv:
+                    trace.write(f"{name},{ts:.1f},{dur:.1f}\n")
+                else:
+                    trace.write(json.dumps(
+                        {"name": name, "ph": "X", "ts": round(ts, 1), "dur": round(dur, 1),
+                         "pid": os.getpid(), "tid": threading.get_ident()}
+                    ) + ",\n")
+
+    # -- reporting --------------------------------------------------------
+    def fps(self) -> float:
+        frames = self._frames
+        if len(frames) < 2:
+            return 0.0
+        return (len(frames) - 1) / (frames[-1] - frames[0] or 1e-9)
+
+    def percentiles(self) -> dict[str, tuple[float, float]]:
+        """stage → (p50, p95) in ms, for stages seen in the window."""
+        out = {}
+        for name, samples in self._samples.items():
+            if samples:
+                ordered = sorted(samples)
+                n = len(ordered)
+                out[name] = (ordered[n // 2], ordered[min(n - 1, int(n * 0.95))])
+        return out
+
+    def hud_text(self) -> str:
+        lines = [f"FPS {self.fps():5.1f}"]
+        lines += [f"{name:<9} p50 {p50:5.1f}  p95 {p95:5.1f} ms"
+                  for name, (p50, p95) in self.percentiles().items()]
+        return "\n".join(lines)
+
+    # -- trace file -------------------------------------------------------
+    def _open_trace(self, path: str) -> None:
+        self._csv = path.lower().endswith(".csv")
+        self._trace = open(path, "w", encoding="utf-8")
+        # the JSON array is left open: the trace viewers accept that, and a
+        # crash still leaves a loadable file
+        self._trace.write("stage,start_us,duration_us\n" if self._csv else "[\n")
+        atexit.register(self.close)
+        print(f"[profiler] writing trace to {path}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._trace is not None:
+                self._trace.close()
+                self._trace = None
+
+
+class _NullProfiler:
+    def span(self, name: str) -> nullcontext:
+        return _NULL
+
+    def frame(self) -> None:
+        pass
+
+
+_profiler: Profiler | _NullProfiler | None = None
+
+
+def get() -> Profiler | _NullProfiler:
+    """The app-wide profiler – a no-op one unless ``ENABLED``/``TRACE_PATH``."""
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler(trace_path=TRACE_PATH) if (ENABLED or TRACE_PATH) else _NullProfiler()
+    return _profiler
@@ -0,0 +1,126 @@
+# recognisers.py
+
+"""Pluggable speech recognisers for ``audio.AudioService``.
+
+* ``GoogleRecogniser``  – cloud, whole phrase at once (the previous behaviour)
+* ``VoskRecogniser``    – offline and streaming; partial results let short
+  commands act before the phrase is over (needs ``pip install vosk`` + a model)
+* ``FixtureRecogniser`` – no microphone at all; replays utterances from a
+  text file, for tests and demos
+"""
+from __future__ import annotations
+
+import json
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:   # imported lazily, on the audio thread
+    import speech_recognition as sr
+
+
+class Recogniser(ABC):
+    """Base class. Streaming engines override :meth:`feed` as well."""
+
+    name = "base"
+
+    def reset(self) -> None:
+        """A new utterance starts."""
+
+    def feed(self, frame: bytes) -> str | None:
+        """Audio as it arrives; return a partial transcript if the engine has one."""
+        return None
+
+    @abstractmethod
+    def finish(self, audio: sr.AudioData) -> str | None:
+        """Whole utterance; return the transcript or ``None`` if unintelligible."""
+
+
+class GoogleRecogniser(Recogniser):
+    name = "google"
+
+    def __init__(self) -> None:
+        self._recog: sr.Recognizer | None = None
+
+    def finish(self, audio: sr.AudioData) -> str | None:
+        import speech_recognition as sr
+
+        if self._recog is None:
+            self._recog = sr.Recognizer()
+        try:
+            return self._recog.recognize_google(audio).strip()
+        except sr.UnknownValueError:
+            return None
+
+
+class VoskRecogniser(Recogniser):
+    name = "vosk"
+
+    def __init__(self, model_path: str, sample_rate: int = 16000) -> None:
+        try:
+            import vosk
+        except ImportError as e:
+            raise RuntimeError("Offline recognition needs `pip install vosk` and a model") from e
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self._model = vosk.Model(model_path)
+        self._rate = sample_rate
+        self.reset()
+
+    def reset(self) -> None:
+        self._rec = self._vosk.KaldiRecognizer(self._model, self._rate)
+        self._done: list[str] = []
+
+    def feed(self, frame: bytes) -> str | None:
+        if self._rec.AcceptWaveform(frame):
+            self._done.append(json.loads(self._rec.Result()).get("text", ""))
+            return " ".join(self._done).strip() or None
+        partial = json.loads(self._rec.PartialResult()).get("partial", "")
+        return " ".join([*self._done, partial]).strip() or None
+
+    def finish(self, audio: sr.AudioData) -> str | None:
+        self._done.append(json.loads(self._rec.FinalResult()).get("text", ""))
+        return " ".join(self._done).strip() or None
+
+
+class FixtureRecogniser(Recogniser):
+    """Utterances from a file: one per line, optionally ``<delay_s>\\t<text>``.
+
+    Blank lines and ``#`` comments are skipped; the default delay is 1 s.
+    """
+
+    name = "fixture"
+
+    def __init__(self, path: str | Path, default_delay: float = 1.0) -> None:
+        self.lines: list[tuple[float, str]] = []
+        for raw in Path(path).read_text().splitlines():
+            if not raw.strip() or raw.lstrip().startswith("#"):
+                continue
+            delay, sep, text = raw.partition("\t")
+            if sep:
+                self.lines.append((float(delay), text.strip()))
+            else:
+                self.lines.append((default_delay, raw.strip()))
+
+    def utterances(self) -> Iterator[str]:
+        for delay, text in self.lines:
+            time.sleep(delay)
+            yield text
+
+    def finish(self, audio: sr.AudioData) -> str | None:
+        return None
+
+
+def make_recogniser(kind: str = "google", *, model: str | None = None, fixture: str | None = None) -> Recogniser:
+    if kind == "google":
+        return GoogleRecogniser()
+    if kind == "vosk":
+        if not model:
+            raise ValueError("--recogniser vosk needs --vosk-model PATH")
+        return VoskRecogniser(model)
+    if kind == "fixture":
+        if not fixture:
+            raise ValueError("--recogniser fixture needs --voice-fixture FILE")
+        return FixtureRecogniser(fixture)
+    raise ValueError(f"Unknown recogniser {kind!r}")
@@ -0,0 +1,418 @@
+# recording.py
+
+"""Session recording (``--record FILE``) and replay.
+
+A recording is two files:
+
+``FILE``
+    Append-only records: a header (magic + wall-clock start), then per
+    record ``<d t><B kind><I n>`` followed by *n* bytes of compact JSON.
+    ``t`` is seconds since the session started, ``kind`` where the event
+    came from – ``OUT`` (``_broadcast``), ``IN`` (``_apply_event`` and
+    remote cursors) or ``STATE`` (a game-state transition).  A torn last
+    record after a crash is ignored when reading.
+``FILE.idx``
+    Fixed-size ``<d t><Q offset>`` entries, one per ``INDEX_EVERY_S``
+    seconds, in time order.  :class:`Recording` memory-maps both files and
+    bisects the index, so seeking in a long session reads only what it
+    plays – plus, to rebuild the canvas, the records since the last clear
+    (new round, correct guess, snapshot) before the seek point, found by
+    scanning back one index interval at a time.  A missing index is
+    rebuilt with one pass over the records.
+
+Replay::
+
+    python -m gesture_drawing.recording FILE [--speed 4] [--from 120] [--to 180]
+    python -m gesture_drawing.recording FILE --headless [--speed 0]
+    python -m gesture_drawing.recording FILE --info
+
+draws through ``GestureDrawingApp._apply_event`` – in a window, or on a
+``headless.HeadlessCanvas`` (``--speed 0``: as fast as possible, with a
+time-per-event summary).
+"""
+from __future__ import annotations
+
+import argparse
+import atexit
+import json
+import mmap
+import struct
+import sys
+import threading
+import time
+from collections import Counter
+from itertools import chain
+from pathlib import Path
+from typing import Any, Iterator, NamedTuple
+
+from . import brushes
+
+RECORD_PATH: str | None = None   # set this in your main.py (--record)
+
+MAGIC = b"GDREC\x02"              # 2: coordinates in canvas units (0..1)
+_HEADER = struct.Struct("<6sd")    # magic, wall-clock start
+_RECORD = struct.Struct("<dBI")    # t, kind, payload length
+_INDEX = struct.Struct("<dQ")      # t, offset of the first record at/after t
+
+OUT, IN, STATE = 0, 1, 2
+KINDS = ("out", "in", "state")
+
+INDEX_EVERY_S = 1.0
+
+
+def _index_path(path: Path) -> Path:
+    return path.with_name(path.name + ".idx")
+
+
+# ── WRITING ────────────────────────────────────────────────────────────────────
+class Recorder:
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.records = 0
+        self._t0 = time.perf_counter()
+        self._next_index = 0.0
+        self._lock = threading.Lock()   # voice callbacks may broadcast off the Tk thread
+        self._file = open(self.path, "wb")
+        self._index = open(_index_path(self.path), "wb")
+        self._file.write(_HEADER.pack(MAGIC, time.time()))
+        atexit.register(self.close)
+        print(f"[recording] writing session to {self.path}")
+
+    def record(self, kind: int, ev: dict) -> None:
+        payload = json.dumps(ev, separators=(",", ":")).encode()
+        with self._lock:
+            if self._file is None:
+                return
+            t = time.perf_counter() - self._t0
+            if t >= self._next_index:
+                # flush first: an index entry never points past the data
+                self._file.flush()
+                self._index.write(_INDEX.pack(t, self._file.tell()))
+                self._index.flush()
+                self._next_index = t + INDEX_EVERY_S
+            self._file.write(_RECORD.pack(t, kind, len(payload)))
+            self._file.write(payload)
+            self.records += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._index.close()
+                self._file = None
+                print(f"[recording] {self.records} events in {self.path}")
+
+
+class _NullRecorder:
+    def record(self, kind: int, ev: dict) -> None:
+        pass
+
+
+NULL = _NullRecorder()
+_recorder: Recorder | _NullRecorder | None = None
+
+
+def get() -> Recorder | _NullRecorder:
+    """The session recorder – a no-op one unless ``RECORD_PATH`` is set."""
+    global _recorder
+    if _recorder is None:
+        _recorder = Recorder(RECORD_PATH) if RECORD_PATH else NULL
+    return _recorder
+
+
+# ── READING ────────────────────────────────────────────────────────────────────
+class Record(NamedTuple):
+    t: float
+    kind: int
+    event: dict
+
+
+class Recording:
+    """Read-only, memory-mapped view of a recording."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._data) < _HEADER.size or self._data[:len(MAGIC)] != MAGIC:
+            old = self._data[:len(MAGIC) - 1] == MAGIC[:-1]
+            self._data.close()
+            if old:
+                raise ValueError(f"{self.path}: recorded by an older version (pixel coordinates)")
+            raise ValueError(f"{self.path}: not a gesture_drawing recording")
+        self.started: float = _HEADER.unpack_from(self._data)[1]
+        self._index = self._load_index()
+
+    def __enter__(self) -> Recording:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._data.close()
+        if isinstance(self._index, mmap.mmap):
+            self._index.close()
+
+    def _load_index(self) -> mmap.mmap | bytes:
+        path = _index_path(self.path)
+        size = path.stat().st_size if path.exists() else 0
+        size -= size % _INDEX.size   # torn last entry
+        if size:
+            with open(path, "rb") as f:
+                return mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+        entries = bytearray()
+        next_t = 0.0
+        for offset, t, _, _, _ in self._scan(_HEADER.size):
+            if t >= next_t:
+                entries += _INDEX.pack(t, offset)
+                next_t = t + INDEX_EVERY_S
+        return bytes(entries)
+
+    def _scan(self, offset: int) -> Iterator[tuple[int, float, int, int, int]]:
+        """(offset, t, kind, payload start, payload length) from *offset* on."""
+        data, end = self._data, len(self._data)
+        while offset + _RECORD.size <= end:
+            t, kind, n = _RECORD.unpack_from(data, offset)
+            start = offset + _RECORD.size
+            if start + n > end:
+                return
+            yield offset, t, kind, start, n
+            offset = start + n
+
+    def _entries_until(self, t: float) -> int:
+        """Number of index entries at or before time *t*."""
+        index = self._index
+        lo, hi = 0, len(index) // _INDEX.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _INDEX.unpack_from(index, mid * _INDEX.size)[0] <= t:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _entry_offset(self, i: int) -> int:
+        if i < 0:
+            return _HEADER.size
+        return min(_INDEX.unpack_from(self._index, i * _INDEX.size)[1], len(self._data))
+
+    def offset_at(self, t: float) -> int:
+        """Offset of a record at or before time *t*, found by bisecting the index."""
+        return self._entry_offset(self._entries_until(t) - 1)
+
+    def _clear_before(self, t: float) -> int:
+        """Offset of the last record before *t* that cleared the canvas, else of the first."""
+        data = self._data
+        stop = None
+        for i in range(self._entries_until(t) - 1, -2, -1):
+            start, found = self._entry_offset(i), None
+            for offset, rt, _, s, n in self._scan(start):
+                if rt >= t or (stop is not None and offset >= stop):
+                    break
+                # cheap byte test first: only candidates are parsed
+                if (any(data.find(mark, s, s + n) >= 0 for mark in _CLEAR_MARKS)
+                        and json.loads(data[s:s + n]).get("type") in _CLEARS):
+                    found = offset
+            if found is not None:
+                return found
+            stop = start
+        return _HEADER.size
+
+    def catch_up(self, t: float) -> Iterator[Record]:
+        """Records from the last clear before *t* up to *t*: what is on the canvas at *t*."""
+        if t <= 0:
+            return
+        data = self._data
+        for _, rt, kind, s, n in self._scan(self._clear_before(t)):
+            if rt >= t:
+                return
+            yield Record(rt, kind, json.loads(data[s:s + n]))
+
+    def records(self, start: float = 0.0, end: float | None = None) -> Iterator[Record]:
+        data = self._data
+        for _, t, kind, s, n in self._scan(self.offset_at(start)):
+            if t < start:
+                continue
+            if end is not None and t > end:
+                return
+            yield Record(t, kind, json.loads(data[s:s + n]))
+
+    def duration(self) -> float:
+        last = 0.0
+        for _, t, _, _, _ in self._scan(self.offset_at(float("inf"))):
+            last = t
+        return last
+
+
+# ── REPLAY ─────────────────────────────────────────────────────────────────────
+_SHAPES = {"square_preview", "square_finalize", "circle_preview", "circle_finalize"}
+_CLEARS = {"start_round", "correct_guess", "state_snapshot"}
+_CLEAR_MARKS = tuple(f'"type":"{t}"'.encode() for t in _CLEARS)   # as Recorder writes them
+
+
+def viewer(canvas: Any) -> Any:
+    """A GestureDrawingApp without camera, network or voice, drawing on *canvas*."""
+    from .gesture_app import GestureDrawingApp
+    from .stroke_store import StrokeStore
+
+    app = GestureDrawingApp.__new__(GestureDrawingApp)
+    app.canvas = canvas
+    if canvas is not None:
+        app.canvas_w, app.canvas_h = canvas.winfo_width(), canvas.winfo_height()
+    app.is_drawer = False
+    app.remote_cursors = {}
+    app._cursor_tracks = {}
+    app._drawn = StrokeStore()
+    return app
+
+
+def apply(app: Any, rec: Record) -> None:
+    """Draw one record the way the recording client did; game events only
+    clear the canvas (nothing is sent and no round logic runs)."""
+    ev = rec.event
+    t = ev.get("type")
+    if t in brushes.RENDERERS or t in _SHAPES:
+        app._apply_event(ev)
+    elif t == "cursor":
+        app._place_remote_cursor(ev.get("id", "?"), *ev["coords"])
+    elif t == "cursor_gone":
+        app._remove_remote_cursor(ev["id"])
+    elif t in _CLEARS:
+        app._clear_drawing()
+
+
+class Player:
+    """Records of a recording as they fall due at *speed* × real time.
+
+    Starting part-way in, the records that built the canvas up to *start*
+    are due at once.
+    """
+
+    def __init__(self, recording: Recording, speed: float = 1.0, start: float = 0.0,
+                 end: float | None = None) -> None:
+        self.speed = speed
+        self.start = start
+        self._records = chain(recording.catch_up(start), recording.records(start, end))
+        self._next = next(self._records, None)
+        self._t0 = time.perf_counter()
+
+    @property
+    def done(self) -> bool:
+        return self._next is None
+
+    def position(self) -> float:
+        return self.start + (time.perf_counter() - self._t0) * self.speed
+
+    def due(self) -> list[Record]:
+        now = self.position()
+        out = []
+        while self._next is not None and self._next.t <= now:
+            out.append(self._next)
+            self._next = next(self._records, None)
+        return out
+
+
+def play_window(recording: Recording, speed: float, start: float, end: float | None) -> None:
+    import tkinter as tk
+
+    from .drawing import DrawingApp
+
+    root = tk.Tk()
+    root.title(f"Replay – {recording.path.name}")
+    app = viewer(None)
+    DrawingApp.__init__(app, root)   # the same canvas the live app draws on
+    status = app.canvas.create_text(10, 10, anchor="nw", font=("Courier", 10), tags="replay_status")
+    player = Player(recording, speed, start, end)
+    game: dict = {}
+
+    def tick() -> None:
+        for rec in player.due():
+            if rec.kind == STATE:
+                game.update(rec.event)
+            apply(app, rec)
+        text = f"t = {player.position():7.1f} s  ×{speed:g}"
+        if game:
+            text += f"   round: {game.get('prompt')!r}, drawer {str(game.get('drawer'))[:8]}"
+        if player.done:
+            text += "   (end)"
+        app.canvas.itemconfig(status, text=text)
+        app.canvas.tag_raise("replay_status")
+        if not player.done:
+            root.after(16, tick)
+
+    root.after(0, tick)
+    root.mainloop()
+
+
+def play_headless(recording: Recording, speed: float, start: float, end: float | None) -> dict:
+    """Replay onto a HeadlessCanvas; *speed* 0 means as fast as possible."""
+    from .headless import HeadlessCanvas
+
+    app = viewer(HeadlessCanvas())
+    events = 0
+    applying = 0.0
+    t0 = time.perf_counter()
+    for rec in chain(recording.catch_up(start), recording.records(start, end)):
+        if speed > 0:
+            wait = (rec.t - start) / speed - (time.perf_counter() - t0)
+            if wait > 0:
+                time.sleep(wait)
+        a = time.perf_counter()
+        apply(app, rec)
+        applying += time.perf_counter() - a
+        events += 1
+    return {
+        "events": events,
+        "wall_s": round(time.perf_counter() - t0, 3),
+        "us_per_event": round(applying / events * 1e6, 2) if events else 0.0,
+        "canvas_items": len(app.canvas.items),
+    }
+
+
+def info(recording: Recording) -> None:
+    kinds: Counter[str] = Counter()
+    types: Counter[str] = Counter()
+    for rec in recording.records():
+        kinds[KINDS[rec.kind]] += 1
+        types[rec.event.get("type", "?")] += 1
+    started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(recording.started))
+    print(f"{recording.path}: started {started}, {recording.duration():.1f} s, {sum(kinds.values())} events")
+    print("  " + ", ".join(f"{k} {n}" for k, n in kinds.items()))
+    for t, n in types.most_common():
+        print(f"  {t:<18}{n:>8}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay a --record session")
+    parser.add_argument("file")
+    parser.add_argument("--speed", type=float, default=None,
+                        help="Playback speed (default 1; 0 = as fast as possible, headless only)")
+    parser.add_argument("--from", dest="start", type=float, default=0.0, metavar="S",
+                        help="Start S seconds into the session")
+    parser.add_argument("--to", dest="end", type=float, default=None, metavar="S",
+                        help="Stop S seconds into the session")
+    parser.add_argument("--headless", action="store_true", help="Replay without a window")
+    parser.add_argument("--info", action="store_true", help="Summarise the recording and exit")
+    args = parser.parse_args(argv)
+
+    try:
+        recording = Recording(args.file)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    with recording:
+        if args.info:
+            info(recording)
+        elif args.headless:
+            speed = 0.0 if args.speed is None else args.speed
+            print(json.dumps(play_headless(recording, speed, args.start, args.end)))
+        else:
+            speed = 1.0 if args.speed is None else args.speed
+            if speed <= 0:
+                parser.error("--speed must be positive for windowed replay")
+            play_window(recording, speed, args.start, args.end)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,62 +1,301 @@
 # server.py
+import argparse
 import asyncio
+import json
 import logging
+import multiprocessing
+import time
+import zlib
 import websockets
-import json
+
+try:
+    from . import envelope
+    from .config import WS_COMPRESSION, MAX_FRAME_SIZE, COMPRESS_LEVEL, SPECTATOR_INTERVAL_S
+    from .metrics import RelayMetrics
+    from .spectators import SpectatorFeed
+except ImportError:  # run as a script: python gesture_drawing/server.py
+    import envelope
+    from config import WS_COMPRESSION, MAX_FRAME_SIZE, COMPRESS_LEVEL, SPECTATOR_INTERVAL_S
+    from metrics import RelayMetrics
+    from spectators import SpectatorFeed
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("relay")
 
-clients: dict[str, websockets.WebSocketServerProtocol] = {}   # id → ws
+DEFAULT_ROOM = "lobby"
+
+rooms: dict[str, dict[str, websockets.WebSocketServerProtocol]] = {}   # room → id → ws
+feeds: dict[str, SpectatorFeed] = {}   # room → spectators, only while it has any
+metrics = RelayMetrics()
+
+
+def _all_clients() -> dict[str, websockets.WebSocketServerProtocol]:
+    return {cid: ws for members in rooms.values() for cid, ws in members.items()}
+
+
+def room_shard(room: str, workers: int) -> int:
+    """Stable room → worker index (same on every process and restart)."""
+    return zlib.crc32(room.encode()) % workers
+
+
+async def _spectator_loop(feed: SpectatorFeed) -> None:
+    """Send *feed*'s batch to its spectators every SPECTATOR_INTERVAL_S."""
+    while feed.viewers:
+        await asyncio.sleep(SPECTATOR_INTERVAL_S)
+        frame = feed.take(COMPRESS_LEVEL)
+        if frame is None:
+            continue
+        # one compressed frame for everybody; slow screens are skipped, not awaited
+        websockets.broadcast(feed.viewers.values(), frame)
+        metrics.on_send("batch", len(frame), len(feed.viewers))
+
+
+def _join_spectator(room: str, my_id: str, ws) -> SpectatorFeed:
+    feed = feeds.get(room)
+    if feed is None:
+        feed = feeds[room] = SpectatorFeed(room)
+    feed.viewers[my_id] = ws
+    if feed.task is None or feed.task.done():
+        feed.task = asyncio.create_task(_spectator_loop(feed))
+    return feed
+
 
 # Only one parameter here!
 async def handler(ws):
     my_id: str | None = None
+    room: str | None = None
+    members: dict[str, websockets.WebSocketServerProtocol] = {}
+    feed: SpectatorFeed | None = None   # set if this client is a spectator
     try:
         async for msg in ws:
-            data = json.loads(msg)
+            # route on the envelope header only – the payload is never decoded
+            env = envelope.peek(msg)
+            metrics.on_receive(my_id, env.type, len(msg))
 
-            # ① first message from each client must be {"type":"hello","id":…}
-            if data.get("type") == "hello":
-                my_id = data["id"]
-                clients[my_id] = ws
-                logger.info(f"Registered client {my_id} @ {ws.remote_address}")
+            # ① first message from each client must be a hello carrying id + room
+            if env.type == "hello":
+                my_id = env.sender
+                room = env.room or DEFAULT_ROOM
+                members = rooms.setdefault(room, {})
+                # the one payload the relay reads: is this a spectator?
+                if envelope.unpack(msg).get("role") == "spectator":
+                    feed = _join_spectator(room, my_id, ws)
+                else:
+                    members[my_id] = ws
+                await ws.send(envelope.pack({"type": "welcome", "room": room}, room=room))
+                logger.info(f"Registered {'spectator' if feed else 'client'} {my_id} in room {room!r} "
+                            f"@ {ws.remote_address}")
+                # fall through: the rest of the room sees the hello and the
+                # current drawer answers with a state_snapshot
+            elif feed is not None:
+                metrics.on_drop("spectator")   # read-only
                 continue
 
-            # ② directed message?
-            target = data.pop("to", None)
-            if target and target in clients:
+            # ② directed message? (only within the sender's room)
+            if env.target:
+                peer = members.get(env.target)
+                if peer is None and room in feeds:   # e.g. a snapshot for a new spectator
+                    peer = feeds[room].viewers.get(env.target)
+                if peer is None:
+                    metrics.on_drop("unknown_target")
+                    continue
                 try:
-                    await clients[target].send(json.dumps(data))
+                    await peer.send(msg)
+                    metrics.on_send(env.type, len(msg))
                 except Exception as e:
-                    logger.warning(f"Direct send to {target} failed: {e!r}")
+                    logger.warning(f"Direct send to {env.target} failed: {e!r}")
+                    metrics.on_drop("send_failed")
                 continue
 
-            # ③ otherwise broadcast to everyone except sender
+            # ③ otherwise broadcast to everyone in the room except sender
             dead = set()
-            for cid, peer in list(clients.items()):
+            sent = 0
+            t0 = time.perf_counter()
+            for cid, peer in list(members.items()):
                 if peer is ws:
                     continue
                 try:
                     await peer.send(msg)
+                    sent += 1
                 except Exception as e:
                     logger.warning(f"Peer {cid} send failed: {e!r}")
                     dead.add(cid)
+            metrics.on_fanout(time.perf_counter() - t0)
+            metrics.on_send(env.type, len(msg), sent)
+            if dead:
+                metrics.on_drop("send_failed", len(dead))
             for d in dead:
-                clients.pop(d, None)
+                members.pop(d, None)
+            room_feed = feeds.get(room)
+            if room_feed is not None:
+                room_feed.add(env, msg)
     except websockets.exceptions.ConnectionClosedOK:
         pass
     except Exception as e:
         logger.exception(f"Unexpected error in handler: {e!r}")
     finally:
+        if feed is not None and feed.viewers.get(my_id) is ws:
+            del feed.viewers[my_id]
+            if not feed.viewers and feeds.get(room) is feed:
+                del feeds[room]   # its loop ends by itself
         if my_id:
-            clients.pop(my_id, None)
+            if members.get(my_id) is ws:
+                members.pop(my_id, None)
+            if room is not None and not members and rooms.get(room) is members:
+                rooms.pop(room, None)
+            metrics.forget_client(my_id)
         logger.info(f"Client disconnected: {ws.remote_address}")
 
-async def main():
-    logger.info("Starting relay on 0.0.0.0:6789")
-    async with websockets.serve(handler, "0.0.0.0", 6789):
-        await asyncio.Future()  # run forever
+# ── ROUTER (multi-process mode) ────────────────────────────────────────────────
+def make_router(port: int, workers: int):
+    """Handler that answers each hello with the port of the room's worker.
+
+    The router never relays drawing traffic: clients reconnect to the
+    worker directly, so it only costs one round trip per join.
+    """
+    async def router(ws):
+        try:
+            room = envelope.peek(await ws.recv()).room or DEFAULT_ROOM
+            shard = room_shard(room, workers)
+            await ws.send(envelope.pack({"type": "redirect", "port": port + 1 + shard}, room=room))
+            logger.info(f"Routed room {room!r} → worker {shard}")
+        except Exception as e:
+            logger.warning(f"Router error: {e!r}")
+    return router
+
+# ── INTROSPECTION ──────────────────────────────────────────────────────────────
+async def _metrics_http(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Tiny HTTP/1.0 endpoint: ``GET /metrics`` (text) or ``GET /metrics.json``."""
+    try:
+        request = (await reader.readline()).decode(errors="replace").split()
+        path = request[1] if len(request) > 1 else "/"
+        if path == "/metrics.json":
+            body = json.dumps(metrics.snapshot(_all_clients(), len(rooms)))
+            ctype, status = "application/json", "200 OK"
+        elif path in ("/", "/metrics"):
+            body = metrics.render_text(_all_clients(), len(rooms))
+            ctype, status = "text/plain; version=0.0.4", "200 OK"
+        else:
+            body, ctype, status = "not found\n", "text/plain", "404 Not Found"
+        payload = body.encode()
+        writer.write(
+            f"HTTP/1.0 {status}\r\nContent-Type: {ctype}\r\n"
+            f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode() + payload
+        )
+        await writer.drain()
+    finally:
+        writer.close()
+
+async def _log_metrics(interval: float) -> None:
+    """Emit one structured (JSON) log line every *interval* seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        snap = metrics.snapshot(_all_clients(), len(rooms))
+        logger.info("metrics %s", json.dumps(snap, separators=(",", ":")))
+
+async def main(
+    port: int = 6789,
+    metrics_port: int = 0,
+    metrics_interval: float = 0.0,
+    compression: str | None = WS_COMPRESSION,
+    max_size: int = MAX_FRAME_SIZE,
+):
+    if metrics_port:
+        await asyncio.start_server(_metrics_http, "127.0.0.1", metrics_port)
+        logger.info(f"Metrics on http://127.0.0.1:{metrics_port}/metrics")
+    metrics_task = None   # the loop only holds a weak reference to tasks
+    if metrics_interval > 0:
+        metrics_task = asyncio.create_task(_log_metrics(metrics_interval))
+    logger.info(f"Starting relay on 0.0.0.0:{port}")
+    async with websockets.serve(handler, "0.0.0.0", port, compression=compression, max_size=max_size):
+        try:
+            await asyncio.Future()  # run forever
+        finally:
+            if metrics_task is not None:
+                metrics_task.cancel()
+
+async def _route(port: int, workers: int):
+    logger.info(f"Starting router on 0.0.0.0:{port} for {workers} workers")
+    async with websockets.serve(make_router(port, workers), "0.0.0.0", port):
+        await asyncio.Future()
+
+def _run_worker(*args) -> None:
+    asyncio.run(main(*args))
+
+def run(
+    port: int = 6789,
+    workers: int = 1,
+    metrics_port: int = 0,
+    metrics_interval: float = 0.0,
+    compression: str | None = WS_COMPRESSION,
+    max_size: int = MAX_FRAME_SIZE,
+) -> None:
+    """Serve on *port*; with ``workers > 1`` rooms are hashed across processes.
+
+    Worker *i* listens on ``port + 1 + i`` (metrics on ``metrics_port + 1 + i``)
+    and the router on *port* tells each joining client where its room lives.
+    """
+    if workers <= 1:
+        asyncio.run(main(port, metrics_port, metrics_interval, compression, max_size))
+        return
+    procs = [
+        multiprocessing.Process(
+            target=_run_worker,
+            args=(
+                port + 1 + i,
+                metrics_port + 1 + i if metrics_port else 0,
+                metrics_interval,
+                compression,
+                max_size,
+            ),
+            daemon=True,
+        )
+        for i in range(workers)
+    ]
+    for p in procs:
+        p.start()
+    try:
+        asyncio.run(_route(port, workers))
+    finally:
+        for p in procs:
+            p.terminate()
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Websocket relay for gesture_drawing")
+    parser.add_argument("--port", type=int, default=6789)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Relay processes; rooms are hashed across them (default: 1)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=0,
+        help="Serve relay metrics on http://127.0.0.1:<port>/metrics (0 = off)",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=0.0,
+        help="Log a JSON metrics line every N seconds (0 = off)",
+    )
+    parser.add_argument(
+        "--compression",
+        choices=("deflate", "none"),
+        default=WS_COMPRESSION or "none",
+        help="permessage-deflate for every frame (clients already zlib large payloads)",
+    )
+    parser.add_argument(
+        "--max-size",
+        type=int,
+        default=MAX_FRAME_SIZE,
+        help="Largest accepted websocket message in bytes",
+    )
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = _parse_args()
+    compression = None if args.compression == "none" else args.compression
+    run(args.port, args.workers, args.metrics_port, args.metrics_interval, compression, args.max_size)
@@ -0,0 +1,66 @@
+# spectators.py
+
+"""Read-only spectator feeds for the relay (see ``server.py``).
+
+A client that says ``"role": "spectator"`` in its hello is not a room
+member: it never gets the raw event stream.  The relay instead copies each
+room frame into the room's :class:`SpectatorFeed`, and every
+``SPECTATOR_INTERVAL_S`` sends all spectators one ``batch`` frame:
+
+* strokes, shapes and game events in order, with a parallel ``senders``
+  list (per-sender playout, see ``jitter.py``),
+* only the latest cursor per cursor id (the header ``key``: one per
+  tracked hand), no shape previews,
+* JSON bodies spliced together as text (never parsed) and zlib-compressed
+  once for the whole audience.
+
+So a room with any number of spectators costs the relay one buffer append
+per message and one compressed frame per interval, sent to each spectator.
+Late joiners still get the drawer's ``state_snapshot``, sent to them
+directly.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    from . import envelope
+except ImportError:  # run as a script: python gesture_drawing/server.py
+    import envelope
+
+# transient, superseded by what follows – not worth sending to a screen
+SKIP = {"square_preview", "circle_preview", "hello", "guess"}
+
+
+class SpectatorFeed:
+    def __init__(self, room: str) -> None:
+        self.room = room
+        self.viewers: dict[str, Any] = {}   # id → websocket
+        self.task: Any = None               # the room's flush loop
+        self._bodies: list[tuple[str, str]] = []           # (sender, body)
+        self._cursors: dict[str, tuple[str, str]] = {}     # cursor id → latest (sender, body)
+
+    def add(self, env: envelope.Envelope, frame: str | bytes) -> None:
+        if env.type in SKIP:
+            return
+        if env.type == "cursor":
+            self._cursors[env.key or env.sender] = (env.sender, envelope.body(frame))
+            return
+        if env.type == "cursor_gone":
+            self._cursors.pop(env.key or env.sender, None)
+        self._bodies.append((env.sender, envelope.body(frame)))
+
+    def take(self, compress_level: int = 1) -> bytes | None:
+        """Everything since the last call as one compressed ``batch`` frame."""
+        if not self._bodies and not self._cursors:
+            return None
+        events = self._bodies + list(self._cursors.values())
+        self._bodies = []
+        self._cursors = {}
+        senders = json.dumps([sender for sender, _ in events])   # header strings, not payloads
+        body = ('{"type":"batch","senders":' + senders
+                + ',"events":[' + ",".join(b for _, b in events) + "]}")
+        # always compressed (compress_over=0): the whole point is fewer bytes per screen
+        return envelope.pack_body("batch", body, room=self.room, compress_over=0,
+                                  compress_level=compress_level)
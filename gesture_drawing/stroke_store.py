@@ -0,0 +1,227 @@
+# stroke_store.py
+
+"""Columnar storage for the drawing history.
+
+``GestureDrawingApp.event_history`` used to be one dict per event – a
+dozen Python objects for a three-field stroke.  :class:`StrokeStore` keeps
+stroke and shape events in typed arrays instead:
+
+    kinds    array('B')  index into the interned event-type table
+    colours  array('H')  index into the interned colour table (0: none)
+    widths   array('f')  line width (0: none)
+    ts       array('d')  send time (NaN: none)
+    starts   array('I')  where the event's points begin in ``coords``
+    coords   array('f')  every event's coordinates, back to back
+
+Anything else (commands, rounds, guesses – a handful per game) keeps its
+dict.  Events come back out as the same dicts ``_apply_event`` draws.
+
+:meth:`StrokeStore.pack` turns a slice into a JSON-able dict of
+base64-encoded little-endian columns, which is what ``state_snapshot`` /
+``snapshot_chunk`` carry; :func:`snapshot_events` decodes either that or a
+plain ``history`` list from an older client.
+
+Event coordinates are fractions of the canvas (0..1 across and down), so
+one event stream draws in the same place on every window size;
+:func:`scaled` converts to and from pixels at the edges.  Sizes are not
+scaled: line / eraser ``width``, shape outlines and the brushes' dot, star
+and ray sizes stay in pixels, so a smaller window shows relatively heavier
+strokes.
+"""
+from __future__ import annotations
+
+import base64
+import math
+import sys
+import threading
+from array import array
+from typing import Iterator
+
+from . import brushes
+
+# event type → key of its coordinate list
+GEOMETRY: dict[str, str] = {b.event: b.geometry for b in brushes.BRUSHES.values()} | {
+    "square_preview": "corners",
+    "square_finalize": "corners",
+    "circle_preview": "bbox",
+    "circle_finalize": "bbox",
+}
+_FIELDS = {"type", "colour", "width", "ts"}
+_KEYS = {kind: frozenset(_FIELDS | {key}) for kind, key in GEOMETRY.items()}   # columnar if no others
+
+UNIT_DIGITS = 5   # 1e-5 of the canvas: well under a pixel, short in JSON
+
+_OTHER = 0   # kind 0: kept as a dict
+_NAN = math.nan
+
+
+def _encode(column: array) -> str:
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return base64.b64encode(column.tobytes()).decode("ascii")
+
+
+def _decode(typecode: str, data: str) -> array:
+    column = array(typecode, base64.b64decode(data))
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+
+def scaled(ev: dict, sx: float, sy: float, digits: int | None = None) -> dict:
+    """A copy of *ev* with its x / y coordinates multiplied by *sx* / *sy*
+    (widths are left alone – they stay in pixels)."""
+    key = GEOMETRY.get(ev["type"], "coords")   # cursors: "coords"
+    xy = ev[key]
+    scale = (sx, sy) * (len(xy) // 2)
+    if digits is None:
+        return {**ev, key: [v * s for v, s in zip(xy, scale)]}
+    return {**ev, key: [round(v * s, digits) for v, s in zip(xy, scale)]}
+
+
+class StrokeStore:
+    """Appends and ``pack`` are locked: voice commands broadcast from the audio
+    thread while the Tk thread adds strokes, and a row is six array appends."""
+
+    __slots__ = ("_kinds", "_colours", "_widths", "_ts", "_starts", "_coords",
+                 "_other", "_kind_names", "_kind_ids", "_colour_names", "_colour_ids", "_lock")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._kinds = array("B")
+        self._colours = array("H")
+        self._widths = array("f")
+        self._ts = array("d")
+        self._starts = array("I")
+        self._coords = array("f")
+        self._other: dict[int, dict] = {}
+        self._kind_names: list[str] = [""]
+        self._kind_ids: dict[str, int] = {}
+        self._colour_names: list[str] = [""]
+        self._colour_ids: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._kinds)
+
+    # -- writing ----------------------------------------------------------
+    def _intern_kind(self, kind: str) -> int:
+        i = self._kind_ids.get(kind)
+        if i is None:
+            i = self._kind_ids[kind] = len(self._kind_names)
+            self._kind_names.append(kind)
+        return i
+
+    def _intern_colour(self, colour: str) -> int:
+        i = self._colour_ids.get(colour)
+        if i is None:
+            i = self._colour_ids[colour] = len(self._colour_names)
+            self._colour_names.append(colour)
+        return i
+
+    def append(self, ev: dict) -> None:
+        kind = ev.get("type")
+        keys = _KEYS.get(kind)
+        with self._lock:
+            if keys is None or not keys.issuperset(ev):
+                self._other[len(self._kinds)] = ev
+                self._append_row(_OTHER, 0, 0.0, _NAN, ())
+                return
+            kind_id = self._kind_ids.get(kind) or self._intern_kind(kind)
+            colour = ev.get("colour")
+            colour_id = 0 if colour is None else self._colour_ids.get(colour) or self._intern_colour(colour)
+            self._append_row(kind_id, colour_id, ev.get("width", 0.0), ev.get("ts", _NAN), ev[GEOMETRY[kind]])
+
+    def _append_row(self, kind: int, colour: int, width: float, ts: float, coords) -> None:
+        self._kinds.append(kind)
+        self._colours.append(colour)
+        self._widths.append(width)
+        self._ts.append(ts)
+        self._starts.append(len(self._coords))
+        self._coords.extend(coords)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+
+    # -- reading ----------------------------------------------------------
+    def event(self, i: int) -> dict:
+        kind = self._kinds[i]
+        if kind == _OTHER:
+            return self._other[i]
+        name = self._kind_names[kind]
+        end = self._starts[i + 1] if i + 1 < len(self._starts) else len(self._coords)
+        ev = {"type": name, GEOMETRY[name]: self._coords[self._starts[i]:end].tolist()}
+        if self._colours[i]:
+            ev["colour"] = self._colour_names[self._colours[i]]
+        width = self._widths[i]
+        if width:
+            ev["width"] = int(width) if width.is_integer() else width
+        ts = self._ts[i]
+        if ts == ts:
+            ev["ts"] = ts
+        return ev
+
+    def events(self, start: int = 0, stop: int | None = None) -> Iterator[dict]:
+        for i in range(*slice(start, stop).indices(len(self))):
+            yield self.event(i)
+
+    __iter__ = events
+
+    def nbytes(self) -> int:
+        """Bytes held by the columns (dict events not included)."""
+        return sum(c.itemsize * len(c) for c in
+                   (self._kinds, self._colours, self._widths, self._ts, self._starts, self._coords))
+
+    # -- wire format ------------------------------------------------------
+    def pack(self, start: int = 0, stop: int | None = None) -> dict:
+        """Events ``[start:stop]`` as base64 columns (plus the two tables)."""
+        with self._lock:
+            return self._pack(start, stop)
+
+    def _pack(self, start: int, stop: int | None) -> dict:
+        start, stop, _ = slice(start, stop).indices(len(self))
+        first = self._starts[start] if start < stop else 0
+        end = self._starts[stop] if stop < len(self._starts) else len(self._coords)
+        starts = array("I", (s - first for s in self._starts[start:stop]))
+        return {
+            "n": stop - start,
+            # copies: the message is serialised on the network thread
+            "kinds": list(self._kind_names),
+            "colours": list(self._colour_names),
+            "k": _encode(self._kinds[start:stop]),
+            "c": _encode(self._colours[start:stop]),
+            "w": _encode(self._widths[start:stop]),
+            "t": _encode(self._ts[start:stop]),
+            "s": _encode(starts),
+            "xy": _encode(self._coords[first:end]),
+            "other": {str(i - start): ev for i, ev in self._other.items() if start <= i < stop},
+        }
+
+    @classmethod
+    def unpack(cls, data: dict) -> StrokeStore:
+        store = cls()
+        store._kind_names = list(data["kinds"])
+        store._kind_ids = {k: i for i, k in enumerate(store._kind_names) if i}
+        store._colour_names = list(data["colours"])
+        store._colour_ids = {c: i for i, c in enumerate(store._colour_names) if i}
+        store._kinds = _decode("B", data["k"])
+        store._colours = _decode("H", data["c"])
+        store._widths = _decode("f", data["w"])
+        store._ts = _decode("d", data["t"])
+        store._starts = _decode("I", data["s"])
+        store._coords = _decode("f", data["xy"])
+        store._other = {int(i): ev for i, ev in data["other"].items()}
+        if not len(store._kinds) == len(store._starts) == data["n"]:
+            raise ValueError("corrupt stroke columns")
+        return store
+
+
+def snapshot_events(ev: dict) -> list[dict]:
+    """The history carried by a ``state_snapshot`` / ``snapshot_chunk``."""
+    if "strokes" in ev:
+        return list(StrokeStore.unpack(ev["strokes"]))
+    return ev.get("history", [])
@@ -3,97 +3,116 @@
 """Voice-command utilities (speech_recognition wrapper)."""
 from __future__ import annotations
 
-import threading
-import time
+import functools
 from typing import Callable, Optional
 import tkinter as tk
-import difflib
 
-import speech_recognition as sr
-
-# your routers:
-from .llm_router import normalise, normalise_brush, normalise_place, normalise_guess
-
-# ── GLOBAL FLAG ────────────────────────────────────────────────────────────────
-# When set, the normal listen_for_commands loop will sleep instead of
-# processing—so only popup logic runs.
-popup_active = threading.Event()
+from . import audio, grammar, latency, voice_process
 
 # ── GENERAL LISTENER ───────────────────────────────────────────────────────────
 CommandCallback = Callable[[str], None]
+ModeSource = Callable[[], str]   # → one of grammar.MODES, asked per utterance
 
 USE_LLM = False  # set this in your main.py 
 
-def listen_for_commands(callback: CommandCallback) -> None:
-    def _listener() -> None:
-        recog = sr.Recognizer()
-        recog.energy_threshold = 150        # better for short commands
-        recog.dynamic_energy_threshold = False
-        with sr.Microphone() as src:
-            recog.adjust_for_ambient_noise(src, duration=1)
-            print("Listening for commands…")
-            while True:
-                if popup_active.is_set():
-                    time.sleep(0.4)
-                    continue
-
-                try:
-                    audio      = recog.listen(src)
-                    transcript = recog.recognize_google(audio).strip()
-                    print(f"[Normal] Heard: {transcript!r}")
-                except sr.UnknownValueError:
-                    continue
-                except sr.RequestError as exc:
-                    print(f"Speech-API request error: {exc}")
-                    continue
-
-                cmd = None
-                if USE_LLM:
-                    # shape‐preview uses special “PLACE” parser
-                    in_shape = (
-                        getattr(callback.__self__, "square_drawing_enabled", False)
-                        or getattr(callback.__self__, "circle_drawing_enabled", False)
-                    )
-                    in_guess_mode = not getattr(callback.__self__, "is_drawer", False)
-                    if in_guess_mode:
-                        # guess mode uses the normal LLM
-                        cmd = normalise_guess(transcript)
-                    else:
-                        cmd = normalise_place(transcript) if in_shape else normalise(transcript)
-                    if cmd:
-                        print(f"→ Normalised to: {cmd}")
-                else:
-                    # exact‐match fallback
-                    cand = transcript.strip().upper()
-                    VALID = {
-                        "START","STOP","SQUARE","CIRCLE",
-                        "ERASER","BRUSH", "SQUARE","CIRCLE","PLACE"
-                    }
-                    if (
-                        cand in VALID
-                        or cand.startswith("CHANGE BRUSH TO ")
-                        or cand.startswith("CHANGE COLOR TO ")
-                        or cand.startswith("MY GUESS IS ")
-                    ):
-                        cmd = cand
-                        print(f"→ Exact match: {cmd}")
-
-                if cmd:
-                    callback(cmd)
-    threading.Thread(target=_listener, daemon=True).start()
+# a weaker local match is still better than nothing if the LLM times out
+FALLBACK_CONFIDENCE = 0.6
+
+def _apply(callback: CommandCallback, trace: latency.Trace, cmd: str) -> None:
+    """Run the command and close its latency trace."""
+    trace.command = cmd
+    trace.mark("normalised")
+    callback(cmd)
+    trace.mark("applied")
+    latency.tracker.record(trace)
+
+def _on_llm_reply(
+    callback: CommandCallback,
+    on_miss: Optional[Callable[[], None]],
+    trace: latency.Trace,
+    fallback: Optional[str],
+    cmd: Optional[str],
+) -> None:
+    trace.source = "llm"
+    if cmd:
+        print(f"→ Normalised to: {cmd}")
+    elif fallback:
+        cmd = fallback
+        trace.source = "fallback"
+        print(f"→ LLM gave nothing, using local match: {cmd}")
+    if cmd:
+        _apply(callback, trace, cmd)
+    elif on_miss is not None:
+        on_miss()
+
+def route_utterance(
+    transcript: str,
+    mode: str,
+    callback: CommandCallback,
+    on_miss: Optional[Callable[[], None]] = None,
+) -> None:
+    """Local grammar first; if it is unsure, one non-blocking LLM call for *mode*.
+
+    *on_miss* runs when neither produced a command.
+    """
+    trace = latency.current()
+    local = grammar.match(transcript, mode)
+    if local and local.confidence >= grammar.THRESHOLD:
+        print(f"→ Matched locally: {local.command} ({local.confidence:.2f})")
+        _apply(callback, trace, local.command)
+        return
+    if not USE_LLM:
+        if on_miss is not None:
+            on_miss()
+        return
+    # imported only with --llm: pulls in requests and the command cache
+    from . import llm_router
+
+    # don't block listening on the HTTP round trip; a newer utterance
+    # supersedes this one
+    prompt = llm_router.prompt_for(local, mode)
+    fallback = local.command if local and local.confidence >= FALLBACK_CONFIDENCE else None
+    llm_router.submit(
+        functools.partial(llm_router.ask, prompt),
+        transcript,
+        functools.partial(_on_llm_reply, callback, on_miss, trace, fallback),
+    )
+
+def listen_for_commands(
+    callback: CommandCallback,
+    mode: ModeSource = lambda: "draw",
+    on_miss: Optional[Callable[[str], None]] = None,
+    on_error: Optional[Callable[[str], None]] = None,
+) -> None:
+    """Feed every utterance through :func:`route_utterance` in ``mode()``.
+
+    *on_miss* gets transcripts that produced no command, *on_error* the
+    audio service's "could not understand" messages.
+    """
+    def _on_text(transcript: str) -> None:
+        miss = functools.partial(on_miss, transcript) if on_miss is not None else None
+        route_utterance(transcript, mode(), callback, miss)
+
+    def _on_partial(partial: str) -> bool:
+        # streaming engines: fire START/STOP while the user is still talking
+        local = grammar.match(partial, mode())
+        if local and local.confidence == 1.0 and local.command in grammar.INSTANT:
+            print(f"→ Matched early: {local.command}")
+            _apply(callback, latency.current(), local.command)
+            return True
+        return False
+
+    audio.service.push(audio.Consumer("Normal", _on_text, on_error, _on_partial))
 
 
 # ── BRUSH POPUP ────────────────────────────────────────────────────────────────
 class BrushSelectionPopup:
-    """Popup that listens for a brush name (via LLM) and returns the match."""
+    """Popup that listens for a brush name and returns the match."""
     def __init__(self, parent: tk.Tk | tk.Toplevel, on_select: Callable[[str], None]):
-        # SIGNAL: enter brush-popup mode (mute normal listener)
-        popup_active.set()
-
         self.top = tk.Toplevel(parent)
         self.top.title("Select Brush")
         self.top.geometry("300x250")
-        # ensure we clear the flag even if user closes window manually
+        # ensure we give the microphone back even if user closes window manually
         self.top.protocol("WM_DELETE_WINDOW", self._on_close)
 
         self.prompt_text = (
@@ -113,54 +132,52 @@ class BrushSelectionPopup:
         self.on_select = on_select
         self.valid = {"solid", "air", "texture", "calligraphy", "blending", "shining"}
 
-        # start the popup-specific listener
-        self._listen_for_choice()
+        # SIGNAL: enter brush-popup mode – utterances come here until closed
+        self._remote = voice_process.running()
+        if self._remote is not None:
+            # the microphone lives in the voice process; ask it for brush names
+            self._consumer = self._remote.push(
+                "brush", self._select,
+                lambda transcript: self._retry(f"‘{transcript}’ not a brush."),
+                self._on_error,
+            )
+        else:
+            self._consumer = audio.Consumer("BrushPopup", self._on_text, self._on_error)
+            audio.service.push(self._consumer)
+
+    def _release(self) -> None:
+        if self._remote is not None:
+            self._remote.remove(self._consumer)
+        else:
+            audio.service.remove(self._consumer)
 
     def _on_close(self):
-        """Clear the flag and destroy if popup closed manually."""
-        popup_active.clear()
+        """Release the microphone and destroy if popup closed manually."""
+        self._release()
         self.top.destroy()
 
-    def _listen_for_choice(self):
-        recog = sr.Recognizer()
-        mic   = sr.Microphone()
-
-        def _worker():
-            with mic as src:
-                recog.adjust_for_ambient_noise(src, duration=1)
-                try:
-                    audio = recog.listen(src, timeout=10)
-                    transcript = recog.recognize_google(audio).strip()
-                    print(f"[BrushPopup] Heard: {transcript!r}")
-
-                    # use your brush-only LLM
-                    brush = normalise_brush(transcript)
-
-                    if brush in self.valid:
-                        print(f"[BrushPopup] Selected brush: {brush}")
-                        # SIGNAL: exit brush-popup mode
-                        popup_active.clear()
-                        self.on_select(brush)
-                        self.top.destroy()
-                        return
-                    else: print(f"[BrushPopup] Invalid brush: {brush}")
-
-                    # invalid input → prompt retry
-                    self.label.config(
-                        text=f"‘{transcript}’ not a brush.\nPlease try again."
-                    )
-                except sr.UnknownValueError:
-                    self.label.config(text="Could not understand.\nPlease try again.")
-                except Exception as e:
-                    self.label.config(text=f"Error: {e}\nPlease try again.")
-
-            # after 2 s, reset prompt and listen again
-            self.top.after(
-                2000,
-                lambda: (
-                    self.label.config(text=self.prompt_text),
-                    self._listen_for_choice()
-                )
-            )
+    def _on_text(self, transcript: str) -> None:
+        # same router as the main listener, in brush mode
+        route_utterance(
+            transcript, "brush", self._select,
+            on_miss=lambda: self._retry(f"‘{transcript}’ not a brush."),
+        )
+
+    def _select(self, brush: str) -> None:
+        if brush not in self.valid:
+            print(f"[BrushPopup] Invalid brush: {brush}")
+            self._retry(f"‘{brush}’ not a brush.")
+            return
+        print(f"[BrushPopup] Selected brush: {brush}")
+        # SIGNAL: exit brush-popup mode
+        self._release()
+        self.on_select(brush)
+        self.top.destroy()
+
+    def _on_error(self, message: str) -> None:
+        self._retry(message)
 
-        threading.Thread(target=_worker, daemon=True).start()
+    def _retry(self, message: str) -> None:
+        self.label.config(text=f"{message}\nPlease try again.")
+        # after 2 s, reset prompt (the microphone stays ours meanwhile)
+        self.top.after(2000, lambda: self.label.config(text=self.prompt_text))
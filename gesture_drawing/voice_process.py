@@ -0,0 +1,169 @@
+# voice_process.py
+
+"""Run the voice pipeline in a child process (``--voice-process``).
+
+Audio capture, VAD, recognition and command normalisation otherwise share
+the interpreter – and the GIL – with MediaPipe and the Tk frame loop.  With
+this option the child owns the microphone and the whole pipeline, and only
+finished commands cross back over a ``multiprocessing`` queue, which the
+app drains from a Tk ``after`` loop.
+
+The parent tells the child which mode to listen in (``voice_mode`` of the
+app, or ``"brush"`` while the brush popup is open) whenever it changes.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import time
+import tkinter as tk
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from . import latency, words
+
+ENABLED = False  # set this in your main.py (--voice-process)
+# recogniser for the child: (kind, vosk model, fixture) – see make_recogniser
+RECOGNISER: tuple[str, Optional[str], Optional[str]] = ("google", None, None)
+
+POLL_MS = 20
+
+
+@dataclass(slots=True)
+class Handler:
+    mode: Optional[str]                       # None → ask the app's mode source
+    on_command: Callable[[str], None]
+    on_miss: Optional[Callable[[str], None]] = None
+    on_error: Optional[Callable[[str], None]] = None
+
+
+# ── CHILD ──────────────────────────────────────────────────────────────────────
+def _child_main(control, out, settings: dict) -> None:
+    from . import audio, voice, words
+    from .recognisers import make_recogniser
+
+    voice.USE_LLM = settings["llm"]
+    words.WORD_FILES = settings["words"]   # lone guess words are checked against the prompts
+    if settings["llm"]:
+        from . import llm_router
+        llm_router.API_URL = settings["llm_url"]
+    try:
+        kind, model, fixture = settings["recogniser"]
+        audio.service.configure(make_recogniser(kind, model=model, fixture=fixture))
+    except (ValueError, RuntimeError) as e:
+        out.put(("fatal", str(e), time.perf_counter()))
+        return
+
+    mode = ["draw"]   # updated by the parent
+    voice.listen_for_commands(
+        lambda cmd: out.put(("command", cmd, time.perf_counter())),
+        lambda: mode[0],
+        on_miss=lambda transcript: out.put(("miss", transcript, time.perf_counter())),
+        on_error=lambda message: out.put(("error", message, time.perf_counter())),
+    )
+    while True:
+        msg = control.get()
+        if msg is None:
+            return
+        kind, value = msg
+        if kind == "mode":
+            mode[0] = value
+
+
+# ── PARENT ─────────────────────────────────────────────────────────────────────
+class VoiceProcess:
+    def __init__(
+        self,
+        master: tk.Misc,
+        callback: Callable[[str], None],
+        mode: Callable[[], str],
+    ) -> None:
+        from . import voice
+
+        self.master = master
+        self._mode_source = mode
+        self._sent_mode: str | None = None
+        self._handlers: list[Handler] = [Handler(None, callback)]
+
+        # spawn, not fork: a forked Tk / MediaPipe process is not safe to use
+        ctx = multiprocessing.get_context("spawn")
+        self._control = ctx.Queue()
+        self._out = ctx.Queue()
+        settings = {"llm": voice.USE_LLM, "llm_url": None, "recogniser": RECOGNISER,
+                    "words": words.WORD_FILES}
+        if voice.USE_LLM:
+            from . import llm_router
+            settings["llm_url"] = llm_router.API_URL
+        self._proc = ctx.Process(
+            target=_child_main, args=(self._control, self._out, settings), name="voice", daemon=True
+        )
+        self._proc.start()
+        print(f"Voice pipeline running in process {self._proc.pid}")
+        self.master.after(POLL_MS, self._poll)
+
+    # -- handlers (like audio.AudioService's consumer stack) --------------
+    def push(
+        self,
+        mode: str,
+        on_command: Callable[[str], None],
+        on_miss: Optional[Callable[[str], None]] = None,
+        on_error: Optional[Callable[[str], None]] = None,
+    ) -> Handler:
+        handler = Handler(mode, on_command, on_miss, on_error)
+        self._handlers.append(handler)
+        return handler
+
+    def remove(self, handler: Handler) -> None:
+        if handler in self._handlers[1:]:
+            self._handlers.remove(handler)
+
+    def stop(self) -> None:
+        self._control.put(None)
+
+    # -- Tk loop ----------------------------------------------------------
+    def _poll(self) -> None:
+        top = self._handlers[-1]
+        mode = top.mode or self._mode_source()
+        if mode != self._sent_mode:
+            self._control.put(("mode", mode))
+            self._sent_mode = mode
+
+        while True:
+            try:
+                kind, value, sent = self._out.get_nowait()
+            except queue.Empty:
+                break
+            # the child logs its own per-stage breakdown; here only the hop
+            # (perf_counter is a system-wide monotonic clock)
+            latency.tracker.observe("ipc", (time.perf_counter() - sent) * 1000)
+            top = self._handlers[-1]
+            try:
+                if kind == "command":
+                    top.on_command(value)
+                elif kind == "miss" and top.on_miss is not None:
+                    top.on_miss(value)
+                elif kind == "error" and top.on_error is not None:
+                    top.on_error(value)
+                elif kind == "fatal":
+                    print(f"[voice process] could not start: {value}")
+            except Exception as e:
+                print(f"[voice process] handler failed: {e!r}")
+
+        if self._proc.is_alive() or not self._out.empty():
+            self.master.after(POLL_MS, self._poll)
+        else:
+            print(f"[voice process] exited with code {self._proc.exitcode}")
+
+
+_running: VoiceProcess | None = None
+
+
+def start(master: tk.Misc, callback: Callable[[str], None], mode: Callable[[], str]) -> VoiceProcess:
+    global _running
+    if _running is None:
+        _running = VoiceProcess(master, callback, mode)
+    return _running
+
+
+def running() -> VoiceProcess | None:
+    return _running
@@ -0,0 +1,271 @@
+# words.py
+
+"""Prompt words and tolerant guess matching.
+
+Word lists are plain text files, one word or phrase per line (``#``
+comments allowed), loaded with ``--words FILE``; without one the built-in
+``DEFAULT_WORDS`` are used.  :class:`WordIndex` precomputes, per word,
+
+* a canonical key – lower case, accents/punctuation/articles dropped,
+  plural folded to singular, spaces removed ("The Ice-Creams" → "icecream"),
+* its deletion neighbourhood up to ``max_distance`` edits (SymSpell), so
+  a guess finds every word within that edit distance with a few dict
+  lookups instead of a scan of the whole list,
+* a phonetic (Soundex) key, for recognised near-homophones ("flour").
+
+so a speech-recognised guess is resolved to the closest word in roughly
+constant time.  :class:`PromptPicker` picks prompts without recent repeats.
+"""
+from __future__ import annotations
+
+import random
+import re
+import unicodedata
+from collections import deque
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+from .grammar import phonetic_key
+
+WORD_FILES: list[str] = []  # set this in your main.py (--words)
+
+DEFAULT_WORDS: tuple[str, ...] = (
+    "Dog", "Fish", "Bird", "House", "Star", "Heart", "Cloud", "Flower",
+    "Apple", "Boat", "Cup", "Key", "Book", "Moon", "Tree", "Car", "Cat",
+    "Chair", "Shoe", "Hat", "Bed", "Cake", "Bell", "Box", "Pen", "Egg",
+    "Leaf", "Nose", "Fork", "Hand", "Ring", "Football", "Table", "Elephant",
+    "Guitar", "Piano", "Lion",
+)
+
+_ARTICLES = {"a", "an", "the"}
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+# words ending in s that are not plurals
+_NOT_PLURAL = ("ss", "us", "is", "ous")
+# -es after these is always the plural ending (boxes, dishes, glasses)
+_ES_STEMS = ("ches", "shes", "xes", "zes", "sses")
+# -es after these may be either: shoes / potatoes, houses / buses
+_ES_EITHER = ("oes", "ses")
+
+
+# ── NORMALISATION ──────────────────────────────────────────────────────────────
+def singular(word: str, es: bool = False) -> str:
+    """Cheap English plural folding: good enough for prompt words.
+
+    Where -es is ambiguous ("shoes", "buses") this drops just the -s; *es*
+    asks for the other reading ("potato", "bus") instead.
+    """
+    if len(word) <= 3 or not word.endswith("s") or word.endswith(_NOT_PLURAL):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith("ves"):
+        return word[:-3] + "f"
+    if word.endswith(_ES_STEMS) or (es and word.endswith(_ES_EITHER)):
+        return word[:-2]
+    return word[:-1]
+
+
+def canonical(text: str, es: bool = False) -> str:
+    """Key two spellings of the same word share ("The Ice-Creams" → "icecream")."""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    tokens = [t for t in _NON_WORD.split(text) if t]
+    while len(tokens) > 1 and tokens[0] in _ARTICLES:
+        tokens.pop(0)
+    if tokens:
+        tokens[-1] = singular(tokens[-1], es)
+    return "".join(tokens)
+
+
+def deletes(word: str, distance: int) -> set[str]:
+    """Every string reachable from *word* by up to *distance* deletions."""
+    out, frontier = {word}, {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        out |= frontier
+    return out
+
+
+def edit_distance(a: str, b: str, bound: int) -> int:
+    """Optimal-string-alignment distance, or ``bound + 1`` once it exceeds *bound*."""
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    prev2: list[int] = []
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = ca != cb
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > bound:
+            return bound + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+# ── WORD LISTS ─────────────────────────────────────────────────────────────────
+def load_words(paths: Iterable[str | Path]) -> list[str]:
+    """Words from *paths*, first spelling wins for duplicates."""
+    seen: set[str] = set()
+    out: list[str] = []
+    for path in paths:
+        for line in Path(path).read_text(encoding="utf-8").splitlines():
+            word = line.strip()
+            if not word or word.startswith("#"):
+                continue
+            key = canonical(word)
+            if key and key not in seen:
+                seen.add(key)
+                out.append(word)
+    return out
+
+
+class WordMatch(NamedTuple):
+    word: str
+    distance: int     # edits between the canonical keys
+    how: str          # "exact" / "edit" / "phonetic"
+
+
+class WordIndex:
+    def __init__(self, words: Iterable[str], max_distance: int = 1) -> None:
+        self.max_distance = max_distance
+        self.words: list[str] = []
+        self._by_key: dict[str, str] = {}
+        self._deletes: dict[str, list[str]] = {}
+        self._phonetic: dict[str, list[str]] = {}
+        for word in words:
+            self.add(word)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __contains__(self, word: str) -> bool:
+        return self._key(word) in self._by_key
+
+    def _key(self, text: str) -> str:
+        """Canonical key of *text*, using the -es reading of a plural if only that is known."""
+        key = canonical(text)
+        if key not in self._by_key:
+            alt = canonical(text, es=True)
+            if alt in self._by_key:
+                return alt
+        return key
+
+    def add(self, word: str) -> None:
+        key = canonical(word)
+        if not key or key in self._by_key:
+            return
+        self.words.append(word)
+        self._by_key[key] = word
+        for d in deletes(key, self._bound(key)):
+            self._deletes.setdefault(d, []).append(key)
+        self._phonetic.setdefault(phonetic_key(key), []).append(key)
+
+    def _bound(self, key: str) -> int:
+        # one typo in a three-letter word is a different word
+        return 0 if len(key) <= 3 else self.max_distance
+
+    def lookup(self, guess: str) -> WordMatch | None:
+        """Closest word to *guess*, or ``None`` if nothing is close enough."""
+        key = self._key(guess)
+        if not key:
+            return None
+        if key in self._by_key:
+            return WordMatch(self._by_key[key], 0, "exact")
+
+        bound = self._bound(key)
+        best: tuple[int, bool, str] | None = None
+        if bound:
+            sound = phonetic_key(key)
+            for d in deletes(key, bound):
+                for cand in self._deletes.get(d, ()):
+                    limit = min(bound, self._bound(cand))
+                    dist = edit_distance(key, cand, limit)
+                    if dist > limit:
+                        continue
+                    # ties: prefer the one that also sounds the same
+                    rank = (dist, phonetic_key(cand) != sound, cand)
+                    if best is None or rank < best:
+                        best = rank
+            if best is not None:
+                return WordMatch(self._by_key[best[2]], best[0], "edit")
+
+            # recognisers mostly mishear by sound: allow one more edit if
+            # it still sounds the same
+            for cand in self._phonetic.get(sound, ()):
+                dist = edit_distance(key, cand, bound + 1)
+                if dist <= bound + 1 and (best is None or (dist, False, cand) < best):
+                    best = (dist, False, cand)
+            if best is not None:
+                return WordMatch(self._by_key[best[2]], best[0], "phonetic")
+        return None
+
+    def is_match(self, guess: str, target: str) -> bool:
+        """Does *guess* mean *target*?  Closest-word wins, so near misses of
+        *other* dictionary words are not accepted."""
+        key, target_key = self._key(guess), canonical(target)
+        if not key:
+            return False
+        if target_key in (key, canonical(guess, es=True)):
+            return True
+        hit = self.lookup(guess)
+        if target_key in self._by_key:
+            return hit is not None and canonical(hit.word) == target_key
+        # a prompt from a peer with a different list: rank it the way lookup
+        # would, without adding it (that would make it one of our prompts)
+        bound = self._bound(key)
+        sound = phonetic_key(key)
+        dist = edit_distance(key, target_key, bound + 1)
+        if dist <= min(bound, self._bound(target_key)):
+            how = "edit"
+        elif bound and dist <= bound + 1 and phonetic_key(target_key) == sound:
+            how = "phonetic"
+        else:
+            return False
+        if hit is None:
+            return True
+        if hit.how != how:
+            return hit.how == "phonetic"   # exact beats edit beats phonetic
+        hit_key = canonical(hit.word)
+        if how == "edit":
+            return (dist, phonetic_key(target_key) != sound, target_key) < (
+                hit.distance, phonetic_key(hit_key) != sound, hit_key)
+        return (dist, target_key) < (hit.distance, hit_key)
+
+
+class PromptPicker:
+    """Random prompts without repeating any of the last ``memory`` picks."""
+
+    def __init__(self, words: list[str], memory: int = 50) -> None:
+        self.words = words
+        self._recent: deque[str] = deque(maxlen=max(0, min(memory, len(words) // 2)))
+
+    def note(self, word: str) -> None:
+        """A peer picked *word* – don't pick it again soon either."""
+        if self._recent.maxlen:
+            self._recent.append(canonical(word))
+
+    def pick(self) -> str:
+        word = random.choice(self.words)
+        for _ in range(20):   # expected ~1 try unless the list is tiny
+            if canonical(word) not in self._recent:
+                break
+            word = random.choice(self.words)
+        self.note(word)
+        return word
+
+
+_index: WordIndex | None = None
+
+
+def get_index() -> WordIndex:
+    """The index over ``WORD_FILES`` (or the defaults), built on first use."""
+    global _index
+    if _index is None:
+        words = load_words(WORD_FILES) if WORD_FILES else list(DEFAULT_WORDS)
+        if not words:
+            raise ValueError(f"no prompt words in {', '.join(map(str, WORD_FILES))}")
+        _index = WordIndex(words)
+        print(f"[words] indexed {len(_index)} prompt words")
+    return _index